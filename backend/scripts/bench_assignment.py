@@ -0,0 +1,110 @@
+"""
+출석 배정 벤치마크 (기존 pair 정렬 방식 vs 유사도 행렬 기반 배정)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_assignment --users 80 --vectors 300 --faces 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.services.attendance.assignment import assign_greedy, assign_hungarian
+from src.services.user.gallery import FaceGallery
+from src.constants import MATCH_THRESHOLD_ATTENDANCE
+
+
+def cosine_similarity(a, b):
+    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+
+
+# 기존 run_attendance_check 방식: 모든 (얼굴, raw 벡터) 조합을 정렬 후 탐욕 배정
+def legacy_greedy(face_db, unknown_encodings, threshold):
+    all_matches = []
+    for unknown_id, unknown_encoding in enumerate(unknown_encodings):
+        for user_id, user_data in face_db.items():
+            for known_encoding in user_data["raw"]:
+                sim = cosine_similarity(known_encoding, unknown_encoding)
+                all_matches.append(
+                    {"unknown_id": unknown_id, "user_id": user_id, "similarity": sim}
+                )
+
+    all_matches.sort(key=lambda x: x["similarity"], reverse=True)
+
+    matched_users, matched_unknowns, results = set(), set(), []
+    for match in all_matches:
+        if match["similarity"] < threshold:
+            break
+        if match["user_id"] in matched_users or match["unknown_id"] in matched_unknowns:
+            continue
+        matched_users.add(match["user_id"])
+        matched_unknowns.add(match["unknown_id"])
+        results.append((match["unknown_id"], match["user_id"]))
+    return results
+
+
+# 사용자별 기준 얼굴 주변에 흩어진 가짜 임베딩 생성
+def make_synthetic_db(n_users, n_vectors, n_faces, seed=42):
+    rng = np.random.default_rng(seed)
+    bases = rng.normal(size=(n_users, 512)).astype(np.float32)
+    face_db = {
+        user_id: {
+            "raw": list(bases[user_id] + rng.normal(scale=0.8, size=(n_vectors, 512)))
+        }
+        for user_id in range(n_users)
+    }
+    present = rng.choice(n_users, size=min(n_faces, n_users), replace=False)
+    queries = [bases[u] + rng.normal(scale=0.8, size=512) for u in present]
+    return face_db, queries
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=80)
+    parser.add_argument("--vectors", type=int, default=300)
+    parser.add_argument("--faces", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    face_db, queries = make_synthetic_db(args.users, args.vectors, args.faces)
+    threshold = MATCH_THRESHOLD_ATTENDANCE
+
+    gallery = FaceGallery()
+    gallery.rebuild(face_db)
+    gallery.snapshot()  # 스냅샷 구성 비용은 서버 시작/등록 시점에 발생하므로 제외
+
+    legacy, t_legacy = timed(lambda: legacy_greedy(face_db, queries, threshold), 1)
+    (user_ids, scores), t_score = timed(lambda: gallery.match(queries), args.repeat)
+    greedy, t_greedy = timed(lambda: assign_greedy(scores, threshold), args.repeat)
+    hungarian, t_hung = timed(lambda: assign_hungarian(scores, threshold), args.repeat)
+
+    as_pairs = lambda res: sorted((f, user_ids[u]) for f, u, _ in res)
+
+    print(f"users={args.users} vectors/user={args.vectors} faces={args.faces}")
+    print(
+        f"  legacy pair sort + greedy : {t_legacy * 1000:9.1f} ms ({len(legacy)} matched)"
+    )
+    print(f"  gallery matrix scoring    : {t_score * 1000:9.1f} ms")
+    print(
+        f"  matrix greedy             : {t_greedy * 1000:9.3f} ms ({len(greedy)} matched)"
+    )
+    print(
+        f"  matrix hungarian          : {t_hung * 1000:9.3f} ms ({len(hungarian)} matched)"
+    )
+    print(f"  greedy == legacy          : {as_pairs(greedy) == sorted(legacy)}")
+    print(
+        "  hungarian total similarity: "
+        f"{sum(s for *_, s in hungarian):.3f} (greedy {sum(s for *_, s in greedy):.3f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
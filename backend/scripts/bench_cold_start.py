@@ -0,0 +1,55 @@
+"""
+서버 콜드 스타트 측정: src.main import 시간 (+ 선택적으로 얼굴 엔진 로드/워밍업 시간)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_cold_start --repeat 5
+    python -m scripts.bench_cold_start --warmup
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import src.main
+result = {"import_seconds": time.perf_counter() - start}
+if WARMUP:
+    from src.services.user.insightface_wrapper import face_engine
+    face_engine.warmup()
+    result.update(face_engine.status)
+print(json.dumps(result))
+"""
+
+
+# 매번 새 프로세스에서 측정 (모듈 캐시 영향 제거)
+def measure_once(warmup: bool) -> dict:
+    code = IMPORT_SNIPPET.replace("WARMUP", str(warmup))
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", action="store_true")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.warmup) for _ in range(args.repeat)]
+    import_times = [r["import_seconds"] for r in runs]
+    print(
+        f"import src.main: median {statistics.median(import_times):.3f}s "
+        f"(min {min(import_times):.3f}s, max {max(import_times):.3f}s)"
+    )
+    if args.warmup:
+        print(f"  model load   : {runs[-1]['load_seconds']}s")
+        print(f"  warm-up      : {runs[-1]['warmup_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
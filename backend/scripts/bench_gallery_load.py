@@ -0,0 +1,76 @@
+"""
+서버 시작 시 얼굴 갤러리 로딩 시간 측정 (사용자 수별)
+
+합성 사용자 데이터를 임시 디렉토리에 만들고 다음을 비교:
+- legacy_seq : 구버전 face_{id}.pkl 순차 로드 (기존 load_faces_from_files 방식)
+- legacy_par : 구버전 pkl 병렬 로드 (저장소가 없을 때 자동 마이그레이션 경로)
+- store      : 바이너리 갤러리 저장소 로드 (인덱스 한 번 읽기 + 벡터 mmap)
+- + gallery  : 위 결과로 출석체크 갤러리(face_gallery.rebuild)까지 구성한 시간
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_gallery_load --users 100 1000 5000 --vectors 40
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from src.services.user.clustering import update_user_clusters
+from src.services.user.gallery import FaceGallery
+from src.services.user.gallery_store import GalleryStore
+from src.services.user.storage import load_legacy_pickles
+
+
+# 구버전 형식(벡터 리스트 + 클러스터)의 pkl 파일 생성
+def write_legacy_users(data_dir: str, n_users: int, n_vectors: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for user_id in range(n_users):
+        user_db = {
+            user_id: {
+                "raw": list(rng.standard_normal((n_vectors, 512)).astype(np.float32))
+            }
+        }
+        update_user_clusters(user_db, user_id)
+        with open(os.path.join(data_dir, f"face_{user_id}.pkl"), "wb") as f:
+            pickle.dump(user_db[user_id], f)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--vectors", type=int, default=40)
+    args = parser.parse_args()
+
+    print(
+        f"{'users':>6} {'legacy_seq':>11} {'legacy_par':>11} {'store':>8} {'+ gallery':>10}"
+    )
+    for n_users in args.users:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_legacy_users(data_dir, n_users, args.vectors)
+
+            seq_time, _ = timed(load_legacy_pickles, data_dir, workers=1)
+            par_time, legacy_db = timed(load_legacy_pickles, data_dir)
+
+            store = GalleryStore(data_dir)
+            store.compact(legacy_db)
+            store_time, face_db = timed(GalleryStore(data_dir).load)
+            gallery_time, _ = timed(FaceGallery().rebuild, face_db)
+
+            print(
+                f"{n_users:>6} {seq_time:>10.3f}s {par_time:>10.3f}s "
+                f"{store_time:>7.3f}s {store_time + gallery_time:>9.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
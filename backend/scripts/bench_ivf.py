@@ -0,0 +1,72 @@
+"""
+IVF nprobe별 출석 매칭 recall/지연 시간 측정 (합성 갤러리)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_ivf --users 3000 --vectors 60 --faces 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.services.user.gallery import GallerySnapshot, _UserBlock
+from src.utils.vector_utils import normalize_rows
+from src.services.user.ivf_index import IVFIndex, default_nlist, train_coarse_quantizer
+from src.services.user.clustering import update_user_clusters
+
+
+def make_synthetic_db(n_users, n_vectors, seed=42):
+    rng = np.random.default_rng(seed)
+    bases = rng.normal(size=(n_users, 512)).astype(np.float32)
+    face_db = {
+        user_id: {
+            "raw": list(bases[user_id] + rng.normal(scale=0.8, size=(n_vectors, 512)))
+        }
+        for user_id in range(n_users)
+    }
+    return face_db, bases, rng
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=3000)
+    parser.add_argument("--vectors", type=int, default=60)
+    parser.add_argument("--faces", type=int, default=20)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    face_db, bases, rng = make_synthetic_db(args.users, args.vectors)
+    for user_id in face_db:
+        update_user_clusters(face_db, user_id)
+
+    snap = GallerySnapshot({uid: _UserBlock(data) for uid, data in face_db.items()})
+    present = rng.choice(args.users, size=args.faces, replace=False)
+    queries = normalize_rows(
+        bases[present] + rng.normal(scale=0.8, size=(args.faces, 512))
+    )
+
+    start = time.perf_counter()
+    exact = snap.score_users(queries, use_clusters=False)
+    t_exact = time.perf_counter() - start
+    exact_best = np.argmax(exact, axis=1)
+
+    points = snap.coarse_points()
+    ivf = IVFIndex(
+        train_coarse_quantizer(points, default_nlist(len(points))), snap.matrix
+    )
+
+    print(f"users={args.users} rows={len(snap)} nlist={ivf.nlist}")
+    print(f"  exact          : {t_exact * 1000:8.1f} ms")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        scores = ivf.search(queries, snap.row_users, len(snap.user_ids), nprobe)
+        elapsed = time.perf_counter() - start
+        recall = np.mean(np.argmax(scores, axis=1) == exact_best)
+        print(
+            f"  nprobe={nprobe:<3}     : {elapsed * 1000:8.1f} ms  top-1 recall={recall:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
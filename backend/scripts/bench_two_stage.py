@@ -0,0 +1,86 @@
+"""
+2단계 디코딩·검출 측정: 기존 경로(전체 디코딩 + 전체 RGB 변환 + 검출) vs
+축소 디코딩 검출 + 얼굴이 있을 때만 원본 크롭 (FaceEngine.get_faces_encoded_batch)
+
+이미지별 디코딩+검출+임베딩 시간과 최대 메모리(tracemalloc, NumPy 배열 포함)를 비교하고
+두 경로의 bbox 차이(원본 좌표 기준 픽셀)를 함께 출력.
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_two_stage photos/*.jpg --repeat 3
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.services.user.insightface_wrapper import FaceEngine
+from src.utils.image_utils import decode_image
+
+
+# 기존 방식: 전체 해상도 디코딩 → 전체 RGB 변환 → FaceAnalysis 그대로 실행
+def legacy_faces(engine: FaceEngine, image_bytes: bytes):
+    image = cv2.cvtColor(decode_image(image_bytes), cv2.COLOR_BGR2RGB)
+    return engine.model.get(image)
+
+
+# 함수 한 번 실행의 (소요 시간, 최대 메모리 MB, 결과)
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="+")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = FaceEngine()
+    engine.warmup()
+
+    rows = {"legacy": [], "two_stage": []}
+    for path in args.images:
+        with open(path, "rb") as f:
+            image_bytes = f.read()
+
+        for _ in range(args.repeat):
+            rows["legacy"].append(measure(legacy_faces, engine, image_bytes))
+            rows["two_stage"].append(
+                measure(lambda b: engine.get_faces_encoded_batch([b])[0], image_bytes)
+            )
+
+        # 같은 얼굴의 bbox가 원본 좌표에서 얼마나 차이 나는지 (album location 호환 확인)
+        old, new = rows["legacy"][-1][2], rows["two_stage"][-1][2]
+        if len(old) == len(new) and old:
+            diff = max(
+                np.abs(np.asarray(a.bbox) - np.asarray(b.bbox)).max()
+                for a, b in zip(
+                    sorted(old, key=lambda f: tuple(f.bbox)),
+                    sorted(new, key=lambda f: tuple(f.bbox)),
+                )
+            )
+            print(f"{path}: 얼굴 {len(new)}개, bbox 최대 차이 {diff:.1f}px")
+        else:
+            print(f"{path}: 얼굴 수 다름 (기존 {len(old)}, 2단계 {len(new)})")
+
+    for name, runs in rows.items():
+        times = [r[0] * 1000 for r in runs]
+        peaks = [r[1] for r in runs]
+        print(
+            f"{name:>9}: median {statistics.median(times):.1f}ms, "
+            f"peak memory median {statistics.median(peaks):.1f}MB"
+        )
+    print(engine.timings.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+등록 영상 프레임 추출 시간/메모리 비교
+
+합성 영상(mp4v)을 만들어 다음을 비교:
+- legacy : 임시 파일에 쓰고 모든 프레임을 read() → interval마다 리스트에 보관 (기존 방식)
+- grab   : 메모리에서 디코딩, 샘플 사이 프레임은 grab만 (iter_video_frames 기본 경로)
+- seek   : 샘플 위치로 seek 후 read (샘플 간격이 VIDEO_SEEK_MIN_STEP 이상일 때 경로)
+peak_mb는 추출 중 파이썬/NumPy 메모리 최대치 (tracemalloc)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.bench_video_decode --seconds 60 --sample-fps 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.utils import video_utils
+from src.utils.video_utils import iter_video_frames
+
+
+# 프레임 번호가 찍힌 합성 영상 생성 → 영상 바이트
+def make_video(seconds: int, fps: int, size=(1280, 720)) -> bytes:
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    for i in range(seconds * fps):
+        frame = np.roll(background, i * 4, axis=1)
+        cv2.putText(
+            frame, str(i), (50, 200), cv2.FONT_HERSHEY_SIMPLEX, 4, (0, 0, 255), 8
+        )
+        writer.write(frame)
+    writer.release()
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+    return data
+
+
+# 기존 방식 (임시 파일에 쓰고 모든 프레임 read, interval마다 리스트에 보관)
+def legacy_extract(video_bytes: bytes, interval: int):
+    fd, path = tempfile.mkstemp(suffix=".mp4", dir=".")
+    with os.fdopen(fd, "wb") as f:
+        f.write(video_bytes)
+    cap = cv2.VideoCapture(path)
+    frames, frame_count = [], 0
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+        if frame_count % interval == 0:
+            frames.append(frame)
+        frame_count += 1
+    cap.release()
+    os.remove(path)
+    return len(frames)
+
+
+# 프레임을 하나씩 받아 버리는 소비자 (등록 파이프라인처럼 한 장씩 처리)
+def consume(frames) -> int:
+    return sum(1 for _ in frames)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--sample-fps", type=float, nargs="+", default=[3.0, 0.5])
+    args = parser.parse_args()
+
+    video_bytes = make_video(args.seconds, args.fps)
+    print(f"영상 {args.seconds}s @ {args.fps}fps, {len(video_bytes) / 2**20:.1f}MB")
+    print(f"{'sample_fps':>10} {'mode':>7} {'frames':>7} {'time':>8} {'peak_mb':>8}")
+
+    for sample_fps in args.sample_fps:
+        step = max(1, round(args.fps / sample_fps))
+        results = {"legacy": measure(legacy_extract, video_bytes, step)}
+
+        # seek 경로를 끄고/켜서 같은 샘플 간격으로 비교
+        for mode, min_step in (("grab", step + 1), ("seek", 1)):
+            video_utils.VIDEO_SEEK_MIN_STEP = min_step
+            frames = iter_video_frames(video_bytes, sample_fps=sample_fps)
+            results[mode] = measure(consume, frames)
+
+        for mode, (count, elapsed, peak) in results.items():
+            print(
+                f"{sample_fps:>10} {mode:>7} {count:>7} {elapsed:>7.3f}s {peak:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+ONNX Runtime 세션 설정 보정 (호스트별 최적 스레드 수/최적화 수준/검출 크기 찾기)
+
+로컬 이미지들을 실제 서비스처럼 추론 워커 수만큼 동시에 처리하면서,
+설정 조합별 처리량(images/s)과 지연 시간(p50/p95)을 측정함.
+
+실행 (backend 디렉토리에서):
+    python -m scripts.calibrate_onnx --images ./sample_photos
+    python -m scripts.calibrate_onnx --images ./sample_photos --intra 1 2 4 --det-size 480 640
+결과의 최적 설정을 ORT_INTRA_OP_THREADS / ORT_GRAPH_OPT_LEVEL / FACE_DET_SIZE 등
+환경 변수로 지정해서 서버를 실행하면 됨.
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.services.user.insightface_wrapper import FaceEngine
+from src.constants import INFERENCE_WORKERS, ORT_SESSION_CONFIG
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def run_config(images, workers, rounds, session_config, det_size):
+    engine = FaceEngine(session_config=session_config, det_size=det_size)
+    engine.warmup()
+
+    def timed(image):
+        start = time.perf_counter()
+        engine.get_faces(image)
+        return time.perf_counter() - start
+
+    jobs = images * rounds
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(timed, jobs))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "throughput": len(jobs) / elapsed,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p95_ms": np.percentile(latencies, 95) * 1000,
+    }
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--images", required=True, help="측정에 사용할 로컬 이미지 폴더"
+    )
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--intra",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, max(1, cpu_count // INFERENCE_WORKERS), cpu_count}),
+    )
+    parser.add_argument("--opt-level", nargs="+", default=["basic", "extended", "all"])
+    parser.add_argument("--mem-arena", type=int, nargs="+", default=[1, 0])
+    parser.add_argument("--det-size", type=int, nargs="+", default=[640])
+    args = parser.parse_args()
+
+    images = [
+        cv2.imread(str(p))
+        for p in sorted(Path(args.images).iterdir())
+        if p.suffix.lower() in IMAGE_EXTS
+    ]
+    images = [image for image in images if image is not None]
+    if not images:
+        raise SystemExit("측정할 이미지가 없습니다.")
+
+    print(f"이미지 {len(images)}장 × {args.rounds}회, 동시 워커 {args.workers}개\n")
+    print(
+        f"{'intra':>5} {'opt':>9} {'arena':>5} {'det':>5} | {'img/s':>7} {'p50 ms':>8} {'p95 ms':>8}"
+    )
+
+    results = []
+    for intra, level, arena, det_size in itertools.product(
+        args.intra, args.opt_level, args.mem_arena, args.det_size
+    ):
+        config = dict(
+            ORT_SESSION_CONFIG,
+            intra_op_threads=intra,
+            graph_opt_level=level,
+            mem_arena=bool(arena),
+        )
+        stats = run_config(images, args.workers, args.rounds, config, det_size)
+        results.append((config, det_size, stats))
+        print(
+            f"{intra:>5} {level:>9} {arena:>5} {det_size:>5} | "
+            f"{stats['throughput']:>7.2f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f}"
+        )
+
+    best_tp = max(results, key=lambda r: r[2]["throughput"])
+    best_lat = min(results, key=lambda r: r[2]["p95_ms"])
+    for title, (config, det_size, stats) in (
+        ("최대 처리량", best_tp),
+        ("최소 p95 지연", best_lat),
+    ):
+        print(
+            f"\n[{title}] {stats['throughput']:.2f} img/s, p95 {stats['p95_ms']:.1f}ms"
+        )
+        print(f"  ORT_INTRA_OP_THREADS={config['intra_op_threads']}")
+        print(f"  ORT_GRAPH_OPT_LEVEL={config['graph_opt_level']}")
+        print(f"  ORT_ENABLE_MEM_ARENA={int(config['mem_arena'])}")
+        print(f"  FACE_DET_SIZE={det_size}")
+
+
+if __name__ == "__main__":
+    main()
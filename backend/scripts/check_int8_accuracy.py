@@ -0,0 +1,127 @@
+"""
+INT8 인식 모델 정확도/처리량 확인 (FP32 대비)
+
+로컬 이미지 폴더의 얼굴을 한 번 검출·정렬한 뒤, 같은 크롭을 FP32/INT8 인식 모델로
+임베딩해서 비교함:
+  - 임베딩 코사인 유사도 (FP32 vs INT8)
+  - 임베딩 처리량 (crops/sec)
+  - 출석 판정 일치율 (등록된 face_db 대상, MATCH_THRESHOLD_ATTENDANCE 기준)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.check_int8_accuracy --images ./sample_photos
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.services.attendance.assignment import assign_attendance
+from src.services.user.gallery import face_gallery
+from src.services.user.insightface_wrapper import FaceEngine, load_int8_recognition
+from src.services.user.storage import face_db, load_faces_from_files
+from src.utils.vector_utils import normalize_rows
+from src.constants import (
+    ATTENDANCE_ASSIGNMENT,
+    FACE_REC_BATCH_SIZE,
+    MATCH_THRESHOLD_ATTENDANCE,
+)
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+# 배치 단위 임베딩 + 처리량 측정 (repeat번 반복)
+def embed_all(rec_model, crops, batch_size, repeat):
+    embeddings = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        embeddings = np.concatenate(
+            [
+                rec_model.get_feat(crops[i : i + batch_size])
+                for i in range(0, len(crops), batch_size)
+            ]
+        )
+    elapsed = time.perf_counter() - start
+    return embeddings, len(crops) * repeat / elapsed
+
+
+def attendance_decisions(embeddings, image_slices):
+    decisions = []
+    for begin, end in image_slices:
+        if begin == end:
+            decisions.append(set())
+            continue
+        user_ids, scores = face_gallery.match(embeddings[begin:end])
+        results = assign_attendance(
+            user_ids, scores, MATCH_THRESHOLD_ATTENDANCE, ATTENDANCE_ASSIGNMENT
+        )
+        decisions.append({r["user_id"] for r in results})
+    return decisions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--images", required=True, help="비교에 사용할 로컬 이미지 폴더"
+    )
+    parser.add_argument("--batch", type=int, default=FACE_REC_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = FaceEngine(rec_precision="fp32")
+    engine.load()
+    fp32_model = engine.model.models["recognition"]
+    int8_model = load_int8_recognition(fp32_model)
+
+    # 검출·정렬은 한 번만 (두 모델에 같은 크롭 입력)
+    crops, image_slices, used_paths = [], [], []
+    paths = sorted(
+        p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTS
+    )
+    for path in paths:
+        image = cv2.imread(str(path))
+        if image is None:
+            continue
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        faces = engine.detect_faces(rgb)
+        image_slices.append((len(crops), len(crops) + len(faces)))
+        used_paths.append(path)
+        crops.extend(engine.align_crops(rgb, faces))
+
+    if not crops:
+        raise SystemExit("이미지에서 얼굴을 찾지 못했습니다.")
+
+    fp32_emb, fp32_rate = embed_all(fp32_model, crops, args.batch, args.repeat)
+    int8_emb, int8_rate = embed_all(int8_model, crops, args.batch, args.repeat)
+    cos = np.sum(normalize_rows(fp32_emb) * normalize_rows(int8_emb), axis=1)
+
+    print(f"이미지 {len(image_slices)}장, 얼굴 {len(crops)}개")
+    print(f"  FP32 처리량: {fp32_rate:8.1f} crops/s")
+    print(f"  INT8 처리량: {int8_rate:8.1f} crops/s  ({int8_rate / fp32_rate:.2f}x)")
+    print(
+        f"  FP32↔INT8 코사인: 평균 {cos.mean():.4f}, 최소 {cos.min():.4f}, "
+        f"5% 분위 {np.percentile(cos, 5):.4f}"
+    )
+
+    load_faces_from_files()
+    if not face_db:
+        print("  등록된 사용자가 없어 출석 판정 비교는 건너뜀")
+        return
+    face_gallery.rebuild(face_db)
+
+    fp32_decisions = attendance_decisions(fp32_emb, image_slices)
+    int8_decisions = attendance_decisions(int8_emb, image_slices)
+    same = sum(a == b for a, b in zip(fp32_decisions, int8_decisions))
+    print(
+        f"  출석 판정 일치: {same}/{len(image_slices)}장 "
+        f"(threshold={MATCH_THRESHOLD_ATTENDANCE})"
+    )
+    for path, a, b in zip(used_paths, fp32_decisions, int8_decisions):
+        if a != b:
+            print(f"    ⚠️ {path.name}: FP32 {sorted(a)} / INT8 {sorted(b)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+사용자별 raw 얼굴 벡터 coreset 압축 (오프라인)
+
+raw 벡터가 FACE_RAW_MAX_VECTORS를 넘는 사용자를 farthest-point coreset으로
+FACE_CORESET_SIZE개까지 줄이고, 다시 클러스터링한 뒤 갤러리 저장소를 정리한다.
+압축 전에 사용자마다 raw의 일부를 held-out으로 떼어 recall/rank-1을 비교해 출력한다.
+
+실행 (backend 디렉토리에서, 서버를 멈춘 상태에서):
+    python -m scripts.compact_raw_vectors --dry-run
+    python -m scripts.compact_raw_vectors --max-vectors 300 --size 200
+"""
+
+import argparse
+
+import numpy as np
+
+from src.constants import (
+    FACE_CORESET_SIZE,
+    FACE_DATA_DIR,
+    FACE_RAW_MAX_VECTORS,
+    MATCH_THRESHOLD_ATTENDANCE,
+)
+from src.services.user.clustering import update_user_clusters
+from src.services.user.coreset import coreset_recall_report, select_coreset
+from src.services.user.gallery_store import GalleryStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=FACE_DATA_DIR)
+    parser.add_argument("--max-vectors", type=int, default=FACE_RAW_MAX_VECTORS)
+    parser.add_argument("--size", type=int, default=FACE_CORESET_SIZE)
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD_ATTENDANCE)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--dry-run", action="store_true", help="리포트만 출력")
+    args = parser.parse_args()
+
+    store = GalleryStore(args.data_dir)
+    if not store.exists():
+        print("⚠️ 갤러리 저장소가 없습니다. 서버를 한 번 실행해 마이그레이션하세요.")
+        return
+    face_db = store.load()
+
+    report = coreset_recall_report(
+        face_db, args.max_vectors, args.size, args.threshold, args.holdout
+    )
+    print(f"평가 사용자 {report['users']}명 (held-out {args.holdout:.0%})")
+    for stage in ("before", "after"):
+        r = report[stage]
+        print(
+            f"{stage:>6}: vectors={r['vectors']:>7} recall={r['recall']} rank1={r['rank1']}"
+        )
+
+    if args.dry_run:
+        return
+
+    compacted = 0
+    for user_id, user_data in face_db.items():
+        keep = select_coreset(user_data["raw"], args.max_vectors, args.size)
+        if keep is None:
+            continue
+        before = len(user_data["raw"])
+        face_db[user_id] = {"raw": np.array(user_data["raw"][keep])}
+        update_user_clusters(face_db, user_id)
+        print(f"  {user_id}번 사용자: {before} → {len(keep)}")
+        compacted += 1
+
+    if compacted:
+        store.compact(face_db)
+    print(f"✅ {compacted}명 압축 완료: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+영상 등록 증강 방식 비교 (image vs crop)
+
+로컬 등록 영상으로 사용자를 두 방식으로 각각 등록(메모리에서만, 저장 안 함)한 뒤,
+따로 준비한 출석 사진으로 인식률을 비교함:
+  - 등록 시간, 프레임 수, 검출/인식 모델 실행 횟수, 등록 벡터 수
+  - recall: 출석 사진 얼굴이 본인으로 1등이면서 MATCH_THRESHOLD_ATTENDANCE 이상인 비율
+  - rank1: 임계값과 무관하게 본인이 1등인 비율
+
+데이터 구성:
+    videos/{user_id}.mp4          사용자별 등록 영상
+    photos/{user_id}/*.jpg        사용자별 출석 사진 (얼굴 하나씩, 등록 영상과 다른 사진)
+
+실행 (backend 디렉토리에서):
+    python -m scripts.compare_register_augment --videos ./videos --photos ./photos
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.services.user.gallery import FaceGallery
+from src.services.user.insightface_wrapper import face_engine
+from src.services.user.register import embed_video_frames
+from src.utils.image_utils import decode_image
+from src.constants import FACE_PIPELINE_PROFILES, MATCH_THRESHOLD_ATTENDANCE
+
+VIDEO_EXTS = (".mp4", ".webm", ".mov", ".avi", ".mkv")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+# 사용자별 출석 사진 임베딩 (사진마다 가장 큰 얼굴 하나)
+def load_queries(photos_dir: Path):
+    queries = []
+    for user_dir in sorted(p for p in photos_dir.iterdir() if p.is_dir()):
+        for path in sorted(user_dir.iterdir()):
+            if path.suffix.lower() not in IMAGE_EXTS:
+                continue
+            image = decode_image(path.read_bytes())
+            if image is None:
+                continue
+            faces = face_engine.get_faces(
+                image, profile=FACE_PIPELINE_PROFILES["attendance"]
+            )
+            faces = [f for f in faces if f.embedding is not None]
+            if not faces:
+                continue
+            face = max(
+                faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1])
+            )
+            queries.append((int(user_dir.name), face.embedding))
+    return queries
+
+
+# 등록 영상 전체를 한 방식으로 등록 → (face_db, 통계)
+def register_all(videos, augment_mode: str):
+    face_db = {}
+    totals = {"seconds": 0.0, "frames": 0, "detections": 0, "recognitions": 0}
+    face_engine.timings.reset()
+    for user_id, path in videos:
+        start = time.perf_counter()
+        encodings, _, report = embed_video_frames(
+            user_id, path.read_bytes(), augment_mode=augment_mode, save_images=False
+        )
+        totals["seconds"] += time.perf_counter() - start
+        totals["frames"] += report["frames"]
+        if encodings:
+            face_db[user_id] = {"raw": np.asarray(encodings, dtype=np.float32)}
+
+    engine_timings = face_engine.timings.summary()
+    totals["detections"] = engine_timings.get("detection", {}).get("count", 0)
+    totals["recognitions"] = engine_timings.get("recognition", {}).get("count", 0)
+    totals["vectors"] = sum(len(d["raw"]) for d in face_db.values())
+    return face_db, totals
+
+
+def evaluate(face_db, queries, threshold: float):
+    gallery = FaceGallery()
+    gallery.rebuild(face_db)
+    user_ids, scores = gallery.match([q for _, q in queries], use_clusters=False)
+    if not user_ids:
+        return 0.0, 0.0
+    user_ids = np.asarray(user_ids)
+
+    best = scores.argmax(axis=1)
+    truth = np.array([uid for uid, _ in queries])
+    rank1 = user_ids[best] == truth
+    recall = rank1 & (scores[np.arange(len(best)), best] >= threshold)
+    return float(recall.mean()), float(rank1.mean())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", required=True)
+    parser.add_argument("--photos", required=True)
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD_ATTENDANCE)
+    parser.add_argument("--modes", nargs="+", default=["image", "crop"])
+    args = parser.parse_args()
+
+    videos = [
+        (int(p.stem), p)
+        for p in sorted(Path(args.videos).iterdir())
+        if p.suffix.lower() in VIDEO_EXTS
+    ]
+    face_engine.warmup()
+    queries = load_queries(Path(args.photos))
+    print(f"등록 영상 {len(videos)}개, 출석 사진 얼굴 {len(queries)}개")
+
+    print(
+        f"{'mode':>6} {'time':>8} {'frames':>7} {'det':>6} {'rec':>6} "
+        f"{'vectors':>8} {'recall':>7} {'rank1':>7}"
+    )
+    for mode in args.modes:
+        face_db, totals = register_all(videos, mode)
+        recall, rank1 = evaluate(face_db, queries, args.threshold)
+        print(
+            f"{mode:>6} {totals['seconds']:>7.2f}s {totals['frames']:>7} "
+            f"{totals['detections']:>6} {totals['recognitions']:>6} "
+            f"{totals['vectors']:>8} {recall:>7.3f} {rank1:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+buffalo_l 인식 모델(w600k_r50.onnx)을 INT8 동적 양자화 모델로 변환
+
+실행 (backend 디렉토리에서):
+    python -m scripts.quantize_recognition
+    python -m scripts.quantize_recognition --input ~/.insightface/models/buffalo_l/w600k_r50.onnx
+
+변환 후 FACE_REC_PRECISION=int8 로 서버를 실행하면 INT8 모델을 사용함.
+정확도는 scripts.check_int8_accuracy 로 확인.
+"""
+
+import argparse
+import os
+import tempfile
+
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from src.services.user.insightface_wrapper import int8_model_path
+
+DEFAULT_FP32_MODEL = os.path.expanduser(
+    "~/.insightface/models/buffalo_l/w600k_r50.onnx"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", default=DEFAULT_FP32_MODEL)
+    parser.add_argument("--output", default=None)
+    parser.add_argument(
+        "--skip-preprocess",
+        action="store_true",
+        help="shape inference/그래프 최적화 전처리 생략",
+    )
+    args = parser.parse_args()
+
+    src_path = os.path.expanduser(args.input)
+    dst_path = args.output or int8_model_path(src_path)
+    if not os.path.exists(src_path):
+        raise SystemExit(
+            f"FP32 모델이 없습니다: {src_path} (서버를 한 번 실행하면 자동 다운로드됨)"
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(dst_path)), exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = src_path
+        if not args.skip_preprocess:
+            # 양자화 전 shape inference + 그래프 최적화 (onnxruntime 권장 절차)
+            model_path = os.path.join(tmp_dir, "preprocessed.onnx")
+            quant_pre_process(src_path, model_path)
+
+        # 가중치는 INT8로 저장, 활성값은 추론 시점에 동적으로 양자화
+        quantize_dynamic(model_path, dst_path, weight_type=QuantType.QInt8)
+
+    src_mb = os.path.getsize(src_path) / 1024**2
+    dst_mb = os.path.getsize(dst_path) / 1024**2
+    print(f"✅ INT8 모델 생성: {dst_path} ({src_mb:.1f}MB → {dst_mb:.1f}MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import time
 import cv2
 
 import numpy as np
@@ -9,6 +10,7 @@ from fastapi.responses import FileResponse
 
 from src.utils.file_io import load_json, save_json
 from src.services.photo.clustering import process_and_classify_faces
+from src.services.user.insightface_wrapper import face_engine
 from src.constants import (
     METADATA_PATH,
     ALBUM_DIR,
@@ -22,7 +24,9 @@ router = APIRouter()
 
 @router.post("/upload")
 async def upload_faces(files: List[UploadFile] = File(...)):
+    start_time = time.perf_counter()
     results = await process_and_classify_faces(files)
+    face_engine.timings.add("pipeline.album_upload", time.perf_counter() - start_time)
     return {"message": "얼굴 업로드 및 분류 완료", "results": results}
 
 
@@ -37,7 +41,8 @@ def list_albums():
     for face in metadata.values():
         if face.get("too_small"):  # 작아서 제외된 얼굴
             continue
-        person_id = face.get("override") or face.get("person_id", "unknown")
+        # 품질 기준 미달 얼굴(person_id 없음)은 미분류로 표시
+        person_id = face.get("override") or face.get("person_id") or "unknown"
         albums.setdefault(person_id, []).append(face)
 
     album_list = []
@@ -107,7 +112,7 @@ def get_album_faces(album_id: str):
 
     result_faces = []
     for face_id, face in metadata.items():
-        person_id = face.get("override") or face.get("person_id", "unknown")
+        person_id = face.get("override") or face.get("person_id") or "unknown"
         if person_id == album_id:
             result_faces.append(
                 {
@@ -1,22 +1,71 @@
-import os
-import pickle
-from typing import List
+import asyncio
+import threading
+from typing import List, Literal, Optional
 
-import cv2
-import numpy as np
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
 
 from src.services.user.clustering import (
     update_user_clusters,
     visualize_clusters,
 )
-from src.services.user.register import extract_frames_from_video, augment_image
-from src.services.user.storage import face_db
+from src.services.user.register import embed_video_frames
+from src.services.user.storage import (
+    face_db,
+    gallery_store,
+    add_user_vectors,
+    compact_user_vectors,
+    save_user_vectors,
+)
+from src.services.user.gallery import face_gallery
+from src.services.user.recluster import recluster_scheduler
 from src.services.user.insightface_wrapper import face_engine
-from src.constants import FACE_DATA_DIR, FRAME_IMAGE_DIR, AUG_IMAGE_DIR
+from src.services.user.inference_pool import inference_pool
+from src.services.user.embedding_cache import embedding_cache, get_faces_cached
+from src.services.user.face_quality import quality_stats
+from src.constants import (
+    FACE_QUALITY_GATES,
+    CLUSTER_BACKGROUND,
+    REGISTER_AUGMENT_MODE,
+    VIDEO_DEDUP,
+    VIDEO_TRACKING,
+)
 
 router = APIRouter()
 
+# 등록 저장(병합·압축·저장소 기록)은 한 번에 하나씩 (같은 사용자 동시 등록 시 저장소 순서 보장)
+_store_lock = threading.Lock()
+
+
+# 업로드 사진들 디코딩 + 배치 얼굴 검출·임베딩 (추론 풀에서 실행)
+def decode_and_detect_batch(images_bytes: List[bytes]) -> List[list]:
+    return get_faces_cached(images_bytes, "register")
+
+
+# 새 벡터를 face_db에 합치고 (상한을 넘으면 coreset 압축) 클러스터링 후 저장소에 기록
+# CLUSTER_BACKGROUND면 클러스터링은 백그라운드 워커로 미루고 바로 반환
+# (그동안 갤러리는 새 벡터를 포함해 클러스터 없이 전체 비교) → (클러스터링 메시지, 압축 결과)
+# coreset 선택·배열 병합·fsync가 있으므로 API에서는 asyncio.to_thread로 호출
+def store_user_vectors(user_id: int, encodings_list: list):
+    with _store_lock:
+        return _store_user_vectors(user_id, encodings_list)
+
+
+def _store_user_vectors(user_id: int, encodings_list: list):
+    add_user_vectors(user_id, encodings_list)
+    compaction = compact_user_vectors(user_id)
+
+    if not CLUSTER_BACKGROUND:
+        cluster_msg = update_user_clusters(face_db, user_id)
+    face_gallery.update_user(user_id, face_db[user_id])
+
+    # 새 벡터는 갤러리 저장소 끝에 이어 쓰고, 클러스터 결과는 인덱스에 기록
+    save_user_vectors(user_id, encodings_list, replace=compaction is not None)
+
+    if CLUSTER_BACKGROUND:
+        recluster_scheduler.mark_dirty(user_id)
+        cluster_msg = f"사용자 {user_id} 클러스터링이 백그라운드에서 예약되었습니다."
+    return cluster_msg, compaction
+
 
 # 사진 기반 얼굴 등록 API
 @router.post("/register/{user_id}")
@@ -25,14 +74,11 @@ async def register_faces(user_id: int, files: List[UploadFile] = File(...)):
     encodings_list = []
     skipped_files = []  # 얼굴이 2개 이상인 파일 저장용
 
-    for file in files:
-        image_bytes = await file.read()  # 파일을 바이트로 읽기
-        image_np = np.frombuffer(image_bytes, np.uint8)  # 바이트를 NumPy 배열로 변환
-        image = cv2.imdecode(image_np, cv2.IMREAD_COLOR)  # OpenCV 형식으로 변환
-
-        # 얼굴 인식 및 특징 벡터 추출
-        faces = face_engine.get_faces(image)
+    images_bytes = [await file.read() for file in files]  # 파일을 바이트로 읽기
 
+    # 모든 사진의 얼굴 인식 및 특징 벡터 추출 (추론 풀에서 배치로 한 번에 실행)
+    batch_faces = await inference_pool.run(decode_and_detect_batch, images_bytes)
+    for file, faces in zip(files, batch_faces):
         if not faces:
             skipped_files.append(
                 {
@@ -53,6 +99,16 @@ async def register_faces(user_id: int, files: List[UploadFile] = File(...)):
             )
             continue  # 얼굴이 2개 이상이면 등록 안 함
 
+        if faces[0].rejected:
+            skipped_files.append(
+                {
+                    "filename": file.filename,
+                    "detected_faces": 1,
+                    "reason": f"얼굴 품질 기준 미달 ({faces[0].rejected})",
+                }
+            )
+            continue
+
         embedding = face_engine.get_embedding(faces[0])
         encodings_list.append(embedding)
 
@@ -63,48 +119,86 @@ async def register_faces(user_id: int, files: List[UploadFile] = File(...)):
                 "skipped_files": skipped_files,
             }
 
-    # 기존 데이터와 합치기
-    if user_id in face_db:
-        # 만약 기존 데이터가 리스트 형태라면 "raw" 키로 변환
-        if isinstance(face_db[user_id], list):
-            face_db[user_id] = {"raw": face_db[user_id]}
-
-        face_db[user_id]["raw"].extend(encodings_list)
-    else:
-        face_db[user_id] = {"raw": encodings_list}
-
-    # 얼굴 등록 후 클러스터링 업데이트
-    cluster_msg = update_user_clusters(face_db, user_id)
-
-    # 얼굴 벡터 데이터를 파일로 저장
-    save_path = os.path.join(FACE_DATA_DIR, f"face_{user_id}.pkl")
-    with open(save_path, "wb") as f:
-        pickle.dump(face_db[user_id], f)
+    # 기존 데이터와 합치기 + 클러스터링 + 저장 (이벤트 루프를 막지 않도록 스레드에서)
+    cluster_msg, compaction = await asyncio.to_thread(
+        store_user_vectors, user_id, encodings_list
+    )
 
     new_encoding = encodings_list[0]
 
     # 기존 얼굴 데이터와 유사도 비교
-    similarity_results = []
-    for existing_user_id, data in face_db.items():
-        raw_vectors = data.get("raw", [])
-        if raw_vectors:
-            sims = [
-                float(face_engine.cosine_similarity(vec, new_encoding))
-                for vec in raw_vectors
-            ]
-            max_sim = max(sims)
-            similarity_results.append(
-                {"user_id": existing_user_id, "cosine_similarity": max_sim}
-            )
+    user_ids, scores = face_gallery.match([new_encoding], use_clusters=False)
+    similarity_results = [
+        {"user_id": existing_user_id, "cosine_similarity": float(max_sim)}
+        for existing_user_id, max_sim in zip(user_ids, scores[0])
+    ]
 
     return {
         "message": f"{user_id}번 사용자의 얼굴 {len(files)}개 중 {len(encodings_list)}개 등록 완료!",
         "cluster_msg": cluster_msg,  # 클러스터링 결과 메시지 포함
+        "cluster_status": recluster_scheduler.status(
+            user_id
+        ),  # 백그라운드 클러스터링 상태
+        "raw_compaction": compaction,  # coreset 압축 전/후 벡터 수 (압축 안 했으면 None)
         "skipped_files": skipped_files,
         "similarity_results": similarity_results,  # 기존 얼굴과 유사도 출력
     }
 
 
+# 얼굴 엔진 단계별 추론 시간 조회 API (reset=true면 조회 후 초기화)
+@router.get("/engine/timings")
+async def get_engine_timings(reset: bool = False):
+    timings = face_engine.timings.summary()
+    if reset:
+        face_engine.timings.reset()
+    return {"profile": face_engine.default_profile, "timings": timings}
+
+
+# 얼굴 추론 풀 상태 조회 API (대기열 깊이, 대기 시간)
+@router.get("/engine/pool")
+async def get_inference_pool_stats():
+    return inference_pool.stats()
+
+
+# 얼굴 품질 검사 통계 조회 API (파이프라인별 전체 얼굴 수, 사유별 건너뛴 얼굴 수)
+@router.get("/engine/quality")
+async def get_quality_stats(reset: bool = False):
+    stats = quality_stats.summary()
+    if reset:
+        quality_stats.reset()
+    return {"gates": FACE_QUALITY_GATES, "stats": stats}
+
+
+# 얼굴 갤러리 저장소 상태 조회 API (사용자 수, 벡터 수, 구간 수, 파일 크기)
+@router.get("/engine/gallery")
+async def get_gallery_store_stats():
+    return gallery_store.stats()
+
+
+# 얼굴 임베딩 캐시 상태 조회 API (항목 수, 용량, 적중률)
+@router.get("/engine/cache")
+async def get_embedding_cache_stats():
+    return embedding_cache.stats()
+
+
+# 사용자별 백그라운드 클러스터링 상태 조회 API
+@router.get("/cluster_status/{user_id}")
+async def get_cluster_status(user_id: int):
+    cluster_status = recluster_scheduler.status(user_id)
+    if cluster_status is None and user_id not in face_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{user_id}번 사용자의 얼굴 데이터가 없습니다.",
+        )
+    clusters = face_db.get(user_id, {}).get("clusters")
+    return {
+        "user_id": user_id,
+        "status": cluster_status,
+        "n_clusters": len(clusters["centroids"]) if clusters else 0,
+        "scheduler": recluster_scheduler.stats(),
+    }
+
+
 # 클러스터링 시각화 API (얼굴 등록)
 @router.get("/visualize_clusters/{user_id}")
 async def get_cluster_visualization(user_id: int):
@@ -113,7 +207,13 @@ async def get_cluster_visualization(user_id: int):
 
 # 영상 기반 얼굴 등록 API
 @router.post("/register_video/{user_id}")
-async def register_faces_from_video(user_id: int, file: UploadFile = File(...)):
+async def register_faces_from_video(
+    user_id: int,
+    file: UploadFile = File(...),
+    # 증강 방식, 없으면 REGISTER_AUGMENT_MODE
+    augment_mode: Optional[Literal["image", "crop"]] = None,
+    track: Optional[bool] = None,  # 얼굴 추적 + 촘촘한 샘플링, 없으면 VIDEO_TRACKING
+):
     # 파일 확장자 확인
     allowed_exts = (".mp4", ".webm", ".mov", ".avi", ".mkv")
     if not file.filename.lower().endswith(allowed_exts):
@@ -131,76 +231,43 @@ async def register_faces_from_video(user_id: int, file: UploadFile = File(...)):
 
     video_bytes = await file.read()
 
-    # 프레임 추출
-    frames = extract_frames_from_video(video_bytes)
-
-    encodings_list = []
-    skipped = 0
-
-    # 저장 경로 준비
-    frame_dir = os.path.join(FRAME_IMAGE_DIR, str(user_id))
-    aug_dir = os.path.join(AUG_IMAGE_DIR, str(user_id))
-    os.makedirs(frame_dir, exist_ok=True)
-    os.makedirs(aug_dir, exist_ok=True)
-
-    # 데이터 증강
-    for i, frame in enumerate(frames):
-        # 프레임 저장
-        frame_path = os.path.join(frame_dir, f"frame_{i:03d}.jpg")
-        cv2.imwrite(frame_path, frame)
-
-        augmented_images = augment_image(frame)
-
-        for j, img in enumerate(augmented_images):
-            # 증강 이미지 저장
-            aug_path = os.path.join(aug_dir, f"frame{i}_aug{j}.jpg")
-            cv2.imwrite(aug_path, img)
-
-            # 얼굴 감지 및 인코딩
-            faces = face_engine.get_faces(img)
-            if len(faces) == 1:
-                embedding = face_engine.get_embedding(faces[0])
-                encodings_list.append(embedding)
-            else:
-                skipped += 1
+    # 프레임 추출 → 증강 → 얼굴 감지·인코딩 → 저장 파이프라인 (추론 풀에서 실행)
+    encodings_list, skipped, pipeline = await inference_pool.run(
+        embed_video_frames,
+        user_id,
+        video_bytes,
+        augment_mode or REGISTER_AUGMENT_MODE,
+        True,
+        VIDEO_DEDUP,
+        VIDEO_TRACKING if track is None else track,
+    )
 
     if not encodings_list:
-        return {"error": "등록 가능한 얼굴이 없습니다.", "skipped": skipped}
-
-    # 기존 사용자 얼굴 데이터와 병합
-    if user_id in face_db:
-        if isinstance(face_db[user_id], list):
-            face_db[user_id] = {"raw": face_db[user_id]}
-        face_db[user_id]["raw"].extend(encodings_list)
-    else:
-        face_db[user_id] = {"raw": encodings_list}
+        return {
+            "error": "등록 가능한 얼굴이 없습니다.",
+            "skipped": skipped,
+            "pipeline": pipeline,
+        }
 
-    # KMeans 클러스터링 수행
-    cluster_msg = update_user_clusters(face_db, user_id)
-
-    # 저장
-    save_path = os.path.join(FACE_DATA_DIR, f"face_{user_id}.pkl")
-    with open(save_path, "wb") as f:
-        pickle.dump(face_db[user_id], f)
+    # 기존 사용자 얼굴 데이터와 병합 + 클러스터링 + 저장 (이벤트 루프를 막지 않도록 스레드에서)
+    cluster_msg, compaction = await asyncio.to_thread(
+        store_user_vectors, user_id, encodings_list
+    )
 
     # 기존 유저와의 유사도 비교
     new_encoding = encodings_list[0]
-    similarity_results = []
-    for existing_user_id, data in face_db.items():
-        raw_vectors = data.get("raw", [])
-        if raw_vectors:
-            sims = [
-                float(face_engine.cosine_similarity(vec, new_encoding))
-                for vec in raw_vectors
-            ]
-            max_sim = max(sims)
-            similarity_results.append(
-                {"user_id": existing_user_id, "cosine_similarity": max_sim}
-            )
+    user_ids, scores = face_gallery.match([new_encoding], use_clusters=False)
+    similarity_results = [
+        {"user_id": existing_user_id, "cosine_similarity": float(max_sim)}
+        for existing_user_id, max_sim in zip(user_ids, scores[0])
+    ]
 
     return {
         "message": f"✅ 사용자 {user_id} 얼굴 {len(encodings_list)}개 등록 완료!",
         "skipped": skipped,
         "cluster_msg": cluster_msg,
+        "cluster_status": recluster_scheduler.status(user_id),
+        "raw_compaction": compaction,
+        "pipeline": pipeline,  # 프레임 수, 단계별 처리 시간
         "similarity_results": similarity_results,  # 기존 얼굴과 유사도 출력
     }
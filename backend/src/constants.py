@@ -12,6 +12,40 @@ USER_INFO_PATH = os.path.join(FACE_DATA_DIR, "users.json")
 FRAME_IMAGE_DIR = os.path.join("src", "data", "frames")
 AUG_IMAGE_DIR = os.path.join("src", "data", "augmented")
 
+# 등록 영상 프레임 추출 (초당 VIDEO_SAMPLE_FPS장, 최대 VIDEO_MAX_FRAMES장, 0이면 제한 없음)
+# 샘플 간격이 VIDEO_SEEK_MIN_STEP 프레임 이상이면 grab 대신 seek으로 건너뜀
+# 기본값(30fps 영상에 3fps, 간격 10)은 grab 경로라 모든 프레임을 디코딩함 (색 변환·복사만 생략)
+# 간격 10에서 seek은 키프레임부터 다시 디코딩해 grab보다 느림 (scripts.bench_video_decode)
+VIDEO_SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", 3.0))
+VIDEO_MAX_FRAMES = int(os.getenv("VIDEO_MAX_FRAMES", 0))
+VIDEO_SEEK_MIN_STEP = int(os.getenv("VIDEO_SEEK_MIN_STEP", 60))
+VIDEO_TEMP_DIR = os.getenv("VIDEO_TEMP_DIR", "/dev/shm")  # 메모리 스트림 미지원 시
+# 등록 영상 얼굴 추적 (VIDEO_DETECT_EVERY 프레임마다 검출, 그 사이는 광류로 kps를 옮겨 바로 인식)
+# 검출이 줄어드는 만큼 촘촘히 샘플링 (VIDEO_TRACK_SAMPLE_FPS, 30fps 영상이면 2프레임마다)
+# VIDEO_TRACK_MAX_ERROR: 정방향/역방향 추적 오차 허용치 (눈 사이 거리 대비 비율)
+VIDEO_TRACKING = os.getenv("VIDEO_TRACKING", "0") == "1"
+VIDEO_TRACK_SAMPLE_FPS = float(os.getenv("VIDEO_TRACK_SAMPLE_FPS", 15.0))
+VIDEO_DETECT_EVERY = int(os.getenv("VIDEO_DETECT_EVERY", 5))
+VIDEO_TRACK_MAX_ERROR = float(os.getenv("VIDEO_TRACK_MAX_ERROR", 0.05))
+
+# 등록 영상 중복 프레임 건너뛰기 (이미 처리한 프레임과 거의 같으면 증강·인코딩·저장 생략)
+# - VIDEO_DEDUP_HASH_DISTANCE: 프레임 dHash(64비트) 차이가 이 값 이하면 중복 (0이면 검사 안 함)
+# - VIDEO_DEDUP_SIMILARITY: 얼굴 임베딩 코사인 유사도가 이 값 이상이면 중복 (0이면 검사 안 함)
+VIDEO_DEDUP = os.getenv("VIDEO_DEDUP", "1") == "1"
+VIDEO_DEDUP_HASH_DISTANCE = int(os.getenv("VIDEO_DEDUP_HASH_DISTANCE", 4))
+VIDEO_DEDUP_SIMILARITY = float(os.getenv("VIDEO_DEDUP_SIMILARITY", 0.95))
+# 영상 등록 파이프라인 단계 사이 대기열 크기 (프레임 수, 메모리 상한을 결정)
+VIDEO_PIPELINE_QUEUE = int(os.getenv("VIDEO_PIPELINE_QUEUE", 4))
+# 영상 등록 증강 방식
+# - image: 프레임 전체를 증강하고 증강 이미지마다 검출·인식 (프레임당 모델 실행 ~10회)
+# - crop: 프레임당 한 번 검출하고 정렬 크롭(112×112)만 증강해 한 번에 배치 인식
+# 두 방식의 출석 인식률 비교는 python -m scripts.compare_register_augment
+REGISTER_AUGMENT_MODE = os.getenv("REGISTER_AUGMENT_MODE", "image")
+# 데이터 증강 프로세스 수 (0이면 추론 스레드에서 직접 증강)
+AUGMENT_WORKERS = int(
+    os.getenv("AUGMENT_WORKERS", min(4, max(0, (os.cpu_count() or 1) - 1)))
+)
+
 # 인물별 앨범
 MIN_FACE_COUNT = 5
 ALBUM_DIR = os.path.join(BASE_DIR, "src", "data", "album")
@@ -26,6 +60,117 @@ IMAGE_HASH_PATH = os.path.join(ALBUM_DIR, "image_hashes.json")
 
 RECENT_VECTOR_COUNT = 10
 
+# 사용자별 raw 벡터 상한 (넘으면 farthest-point coreset으로 CORESET_SIZE개만 남김)
+# 상한보다 작게 줄여 두어 등록할 때마다 압축이 일어나지 않게 함
+# 압축 전/후 recall은 python -m scripts.compact_raw_vectors --dry-run 으로 확인
+FACE_RAW_MAX_VECTORS = int(os.getenv("FACE_RAW_MAX_VECTORS", 300))
+FACE_CORESET_SIZE = int(os.getenv("FACE_CORESET_SIZE", 200))
+
+# 사용자 얼굴 클러스터링 (등록 시 기존 중심을 새 벡터로 증분 갱신, 아래 조건이면 전체 재학습)
+# - 클러스터 수는 raw 벡터 수에 따라 sqrt(n / 2)개 (CLUSTER_MAX_K 이하), 바뀌면 재학습
+# - 새 벡터의 중심까지 평균 거리² > 기존 평균 거리² × CLUSTER_DRIFT_THRESHOLD
+# - 마지막 재학습 이후 추가된 벡터 > 재학습 당시 벡터 수 × CLUSTER_REFIT_RATIO
+CLUSTER_MAX_K = int(os.getenv("CLUSTER_MAX_K", 10))
+CLUSTER_DRIFT_THRESHOLD = float(os.getenv("CLUSTER_DRIFT_THRESHOLD", 1.5))
+CLUSTER_REFIT_RATIO = float(os.getenv("CLUSTER_REFIT_RATIO", 0.5))
+# 등록 API에서 클러스터링을 백그라운드 워커로 미룰지 (0이면 요청 안에서 바로 수행)
+# 워커는 CLUSTER_DEBOUNCE_SECONDS 동안 모인 등록을 사용자당 한 번으로 합쳐 처리
+CLUSTER_BACKGROUND = os.getenv("CLUSTER_BACKGROUND", "1") == "1"
+CLUSTER_DEBOUNCE_SECONDS = float(os.getenv("CLUSTER_DEBOUNCE_SECONDS", 1.0))
+
+# InsightFace 분석 프로필 (프로필 이름 → 실행할 모듈, None이면 buffalo_l 전체)
+# 백엔드는 bbox/kps/embedding만 사용하므로 기본은 검출+인식만 로드하는 lean 프로필
+FACE_ANALYSIS_PROFILES = {
+    "lean": ["detection", "recognition"],
+    "full": None,  # genderage, landmark_2d_106, landmark_3d_68 포함
+}
+FACE_DEFAULT_PROFILE = os.getenv("FACE_DEFAULT_PROFILE", "lean")
+
+# 인식 모델 정밀도 ("fp32": 기본, "int8": 동적 양자화 모델, CPU 처리량 향상)
+# INT8 모델은 python -m scripts.quantize_recognition 으로 생성
+FACE_REC_PRECISION = os.getenv("FACE_REC_PRECISION", "fp32")
+# INT8 모델 경로 (비우면 FACE_MODEL_DIR/w600k_r50_int8.onnx)
+# buffalo_l 모델 폴더 안에 두면 FaceAnalysis가 폴더의 *.onnx를 모두 읽어 매번 세션을 하나 더 만듦
+FACE_MODEL_DIR = os.path.join(BASE_DIR, "src", "data", "models")
+FACE_REC_INT8_PATH = os.getenv("FACE_REC_INT8_PATH", "")
+
+# 얼굴 엔진 로드 시점
+# - lazy: 첫 요청 때 로드
+# - background: 서버 시작 후 백그라운드에서 로드 + 워밍업 (/ready로 확인)
+# - blocking: 로드 + 워밍업이 끝난 뒤 요청 받기 시작
+FACE_ENGINE_WARMUP = os.getenv("FACE_ENGINE_WARMUP", "background")
+
+# 엔드포인트(파이프라인)별 프로필
+FACE_PIPELINE_PROFILES = {
+    "attendance": os.getenv("FACE_PROFILE_ATTENDANCE", FACE_DEFAULT_PROFILE),
+    "album": os.getenv("FACE_PROFILE_ALBUM", FACE_DEFAULT_PROFILE),
+    "register": os.getenv("FACE_PROFILE_REGISTER", FACE_DEFAULT_PROFILE),
+}
+
+# 얼굴 추론 스레드 풀 (워커 수, 워커가 모두 바쁠 때 대기 가능한 요청 수)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", min(4, os.cpu_count() or 1)))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 32))
+
+# 별도 얼굴 추론 서버 프로세스의 Unix 소켓 경로 (비어 있으면 워커마다 모델 직접 로드)
+INFERENCE_SERVER_SOCKET = os.getenv("INFERENCE_SERVER_SOCKET", "")
+
+# ONNX Runtime 세션 설정 (모든 face_engine 모델 세션에 적용)
+# - intra_op_threads: 연산 하나에 쓰는 스레드 수 (기본: 코어 수 / 추론 워커 수, 0이면 ORT 기본값)
+# - inter_op_threads: 연산 간 병렬 스레드 수 (parallel 실행 모드에서만 의미 있음)
+# - graph_opt_level: disabled / basic / extended / all
+# - mem_arena: CPU 메모리 arena 사용 여부 (끄면 메모리↓, 할당 비용↑)
+# 호스트별 최적값은 python -m scripts.calibrate_onnx 로 확인
+ORT_SESSION_CONFIG = {
+    "intra_op_threads": int(
+        os.getenv(
+            "ORT_INTRA_OP_THREADS", max(1, (os.cpu_count() or 1) // INFERENCE_WORKERS)
+        )
+    ),
+    "inter_op_threads": int(os.getenv("ORT_INTER_OP_THREADS", 0)),
+    "execution_mode": os.getenv("ORT_EXECUTION_MODE", "sequential"),
+    "graph_opt_level": os.getenv("ORT_GRAPH_OPT_LEVEL", "all"),
+    "mem_arena": os.getenv("ORT_ENABLE_MEM_ARENA", "1") == "1",
+}
+
+# 얼굴 검출 입력 크기 (작을수록 빠르지만 작은 얼굴을 놓침)
+FACE_DET_SIZE = int(os.getenv("FACE_DET_SIZE", 640))
+
+# 배치 얼굴 임베딩
+FACE_BATCH_IMAGES = 8  # 한 번에 디코딩·검출할 업로드 이미지 수 (메모리 상한)
+FACE_REC_BATCH_SIZE = 32  # 인식 모델 1회 추론에 넣을 얼굴 크롭 수
+
+# 임베딩 전 얼굴 품질 기준 (파이프라인별, 0이면 해당 검사 생략)
+# 기준에 못 미치는 얼굴은 인식 모델을 실행하지 않음 (단체 사진의 작은 배경 얼굴 등)
+# - min_size: bbox 짧은 변 최소 픽셀 (원본 좌표)
+# - min_det_score: 검출 점수 최소값 (검출기 자체 기준 det_thresh 0.5보다 높아야 의미 있음)
+# - max_yaw: 좌우 회전 정도 최대값 (코가 두 눈 중앙에서 벗어난 거리 / 눈 사이 거리, 정면 0)
+# - min_blur: 정렬 크롭의 Laplacian 분산 최소값 (낮을수록 흐림)
+# 등록(영상 포함)은 회전·블러·가림 증강 이미지를 일부러 쓰므로 점수/pose/blur 검사를 하지 않음
+FACE_QUALITY_GATES = {
+    "attendance": {"min_size": 20, "min_det_score": 0.6, "max_yaw": 1.0, "min_blur": 0},
+    "album": {"min_size": 60, "min_det_score": 0.7, "max_yaw": 1.0, "min_blur": 10},
+    "register": {"min_size": 40, "min_det_score": 0, "max_yaw": 0, "min_blur": 0},
+}
+
+# 이미지 내용(md5) 기반 얼굴 검출·임베딩 캐시 (같은 사진 재업로드 시 추론 생략)
+# MAX_MB를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "src", "data", "embedding_cache")
+)
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", 256))
+
 # threshold 값
 MATCH_THRESHOLD_ALBUM = 0.45
 MATCH_THRESHOLD_ATTENDANCE = 0.43
+
+# 출석 배정 방식 ("hungarian": 유사도 합 최대, "greedy": 유사도 높은 순)
+ATTENDANCE_ASSIGNMENT = "hungarian"
+
+# 출석체크 IVF 인덱스 (등록 사용자가 많을 때 coarse-to-fine 탐색)
+# - MIN_USERS: 등록 사용자가 이 이상이면 IVF 사용
+# - NLIST: coarse 리스트 개수 (0이면 √centroid 수로 자동 결정)
+# - NPROBE: 얼굴마다 탐색할 리스트 수 (높을수록 recall↑ 속도↓)
+GALLERY_IVF_MIN_USERS = int(os.getenv("GALLERY_IVF_MIN_USERS", 500))
+GALLERY_IVF_NLIST = int(os.getenv("GALLERY_IVF_NLIST", 0))
+GALLERY_IVF_NPROBE = int(os.getenv("GALLERY_IVF_NPROBE", 8))
@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # .env 로드
 load_dotenv(dotenv_path=".env")
@@ -17,6 +18,7 @@ from src.apis.album_api import router as album_router
 from src.apis.image_api import router as dalle_router
 from src.apis.sd_api import router as sd_router
 from src.apis.sd_prompt_api import router as moim_router
+from src.services.user.insightface_wrapper import face_engine
 
 # lifespan 적용해서 FastAPI 앱 생성
 app = FastAPI(lifespan=lifespan)
@@ -51,3 +53,12 @@ app.include_router(sd_router, prefix="/sd", tags=["StableDiffusion"])
 @app.get("/")
 def home():
     return {"message": "moimz-mvp API 서버 실행 중!"}
+
+
+# 준비 상태 확인 (얼굴 인식 모델이 로드 + 워밍업되기 전에는 503)
+@app.get("/ready")
+def ready():
+    return JSONResponse(
+        status_code=200 if face_engine.is_ready else 503,
+        content={"ready": face_engine.is_ready, "face_engine": face_engine.status},
+    )
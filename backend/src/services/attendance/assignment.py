@@ -0,0 +1,71 @@
+from typing import List, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# (얼굴 인덱스, 사용자 인덱스, 유사도)
+Assignment = Tuple[int, int, float]
+
+
+# 기준값 미만 조합을 제외한 탐욕적 1:1 배정 (유사도 높은 조합부터)
+def assign_greedy(scores: np.ndarray, threshold: float) -> List[Assignment]:
+    face_idx, user_idx = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[face_idx, user_idx], kind="stable")
+
+    matched_faces = set()
+    matched_users = set()
+    assignments = []
+
+    for k in order:
+        f, u = int(face_idx[k]), int(user_idx[k])
+        if f in matched_faces or u in matched_users:
+            continue
+        matched_faces.add(f)
+        matched_users.add(u)
+        assignments.append((f, u, float(scores[f, u])))
+
+    return assignments
+
+
+# 헝가리안 알고리즘으로 유사도 합이 최대가 되는 1:1 배정
+def assign_hungarian(scores: np.ndarray, threshold: float) -> List[Assignment]:
+    valid = scores >= threshold
+
+    # 기준값 이상 조합이 하나도 없는 행/열은 미리 제거
+    rows = np.flatnonzero(valid.any(axis=1))
+    cols = np.flatnonzero(valid.any(axis=0))
+    if not len(rows) or not len(cols):
+        return []
+
+    # 기준값 미만 조합은 0점 → 배정되더라도 아래에서 버려짐
+    sub = np.where(valid[np.ix_(rows, cols)], scores[np.ix_(rows, cols)], 0.0)
+    row_ind, col_ind = linear_sum_assignment(sub, maximize=True)
+
+    assignments = [
+        (int(rows[r]), int(cols[c]), float(scores[rows[r], cols[c]]))
+        for r, c in zip(row_ind, col_ind)
+        if valid[rows[r], cols[c]]
+    ]
+    # 기존 응답처럼 유사도 높은 순으로 정렬
+    assignments.sort(key=lambda x: x[2], reverse=True)
+    return assignments
+
+
+ASSIGNMENT_METHODS = {
+    "greedy": assign_greedy,
+    "hungarian": assign_hungarian,
+}
+
+
+# 얼굴 × 사용자 유사도 행렬 → 출석 결과 목록
+def assign_attendance(
+    user_ids: List[int], scores: np.ndarray, threshold: float, method: str
+) -> List[dict]:
+    if method not in ASSIGNMENT_METHODS:
+        raise ValueError(f"지원하지 않는 배정 방식입니다: {method}")
+
+    assignments = ASSIGNMENT_METHODS[method](scores, threshold)
+    return [
+        {"user_id": user_ids[u], "similarity": similarity}
+        for _, u, similarity in assignments
+    ]
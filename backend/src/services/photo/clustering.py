@@ -1,6 +1,5 @@
 import os
 import uuid
-import pickle
 from datetime import datetime
 from typing import List
 
@@ -14,11 +13,14 @@ from src.constants import (
     METADATA_PATH,
     REPRESENTATIVES_PATH,
     ALBUM_DIR,
-    FACE_DATA_DIR,
     MATCH_THRESHOLD_ALBUM,
+    FACE_BATCH_IMAGES,
 )
 from src.services.user.insightface_wrapper import face_engine
-
+from src.services.user.inference_pool import inference_pool
+from src.services.user.embedding_cache import get_faces_cached
+from src.services.user.storage import face_db
+from src.utils.image_utils import decode_image
 
 RECENT_VECTOR_COUNT = 20  # 대표 벡터 계산 시 사용하는 벡터 개수
 
@@ -42,6 +44,35 @@ def save_image(file: UploadFile, image_np: np.ndarray, filename: str):
     cv2.imwrite(path, image_np)
 
 
+# 사진 묶음 디코딩 → 저장 → 검출 + 배치 임베딩 (추론 풀에서 실행)
+def decode_save_and_detect(files: List[UploadFile], chunk_bytes: List[bytes]):
+    images, filenames = [], []
+    for file, image_bytes in zip(files, chunk_bytes):
+        image = decode_image(image_bytes)
+
+        # 파일명 중복 방지 및 사진 저장
+        filename = generate_filename(file.filename)
+        save_image(file, image, filename)
+
+        images.append(image)
+        filenames.append(filename)
+
+    # 이미 처리한 적 있는 사진은 캐시된 검출·임베딩 결과 사용
+    batch_faces = get_faces_cached(chunk_bytes, "album", images=images)
+    return list(zip(filenames, batch_faces))
+
+
+# 업로드 사진을 FACE_BATCH_IMAGES장씩 저장·검출하고 배치 임베딩 → (파일명, 얼굴 목록)
+async def detect_faces_in_batches(files: List[UploadFile]):
+    for chunk_start in range(0, len(files), FACE_BATCH_IMAGES):
+        chunk = files[chunk_start : chunk_start + FACE_BATCH_IMAGES]
+        chunk_bytes = [await file.read() for file in chunk]
+
+        detected = await inference_pool.run(decode_save_and_detect, chunk, chunk_bytes)
+        for filename, faces in detected:
+            yield filename, faces
+
+
 # 인물별 클러스터링
 async def process_and_classify_faces(files: List[UploadFile]) -> List[dict]:
     metadata = load_json(METADATA_PATH, {})
@@ -61,17 +92,32 @@ async def process_and_classify_faces(files: List[UploadFile]) -> List[dict]:
 
     results = []
 
-    for file in files:
-        image_bytes = await file.read()
-        image_np = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(image_np, cv2.IMREAD_COLOR)
-
-        # 파일명 중복 방지 및 사진 저장
-        filename = generate_filename(file.filename)
-        save_image(file, image, filename)
-
-        faces = face_engine.get_faces(image)
+    async for filename, faces in detect_faces_in_batches(files):
         for face in faces:
+            if face.rejected:
+                # 품질 기준 미달 얼굴은 임베딩 없이 위치와 탈락 사유만 기록 (대표 벡터에서 제외)
+                # too_small은 크기 기준 탈락일 때만 (자세·블러 탈락은 미분류 앨범에 표시)
+                face_id = get_next_face_id(metadata)
+                x1, y1, x2, y2 = map(int, face.bbox)
+                loc = [y1, x2, y2, x1]
+                metadata[face_id] = {
+                    "file_name": filename,
+                    "location": loc,
+                    "person_id": None,
+                    "too_small": face.rejected == "size",
+                    "rejected": face.rejected,
+                }
+                results.append(
+                    {
+                        "face_id": face_id,
+                        "file_name": filename,
+                        "location": loc,
+                        "person_id": None,
+                        "rejected": face.rejected,
+                    }
+                )
+                continue
+
             embedding = face_engine.get_embedding(face)
             bbox = list(map(int, face.bbox))  # x1, y1, x2, y2
 
@@ -208,7 +254,7 @@ def get_next_face_id(data: dict) -> str:
     return f"face_{next_id:04}"
 
 
-# 출석체크용 `.pkl` 얼굴 데이터 → 대표 벡터 로딩 함수
+# 출석체크용 얼굴 데이터(face_db) → 대표 벡터 로딩 함수
 def load_attendance_representatives() -> dict:
     """
     출석 체크용 얼굴 데이터를 기반으로 대표 벡터를 계산하여 반환함
@@ -217,23 +263,15 @@ def load_attendance_representatives() -> dict:
     """
     reps = {}
 
-    for file in os.listdir(FACE_DATA_DIR):
-        if not file.startswith("face_") or not file.endswith(".pkl"):
+    for user_id, user_data in face_db.items():
+        encodings = user_data["raw"]
+        if not len(encodings):
             continue
 
-        user_id = file.split("_")[1].split(".")[0]
-        path = os.path.join(FACE_DATA_DIR, file)
-
-        with open(path, "rb") as f:
-            user_data = pickle.load(f)
-
-            # 구조가 리스트면 호환 처리
-            encodings = user_data["raw"] if isinstance(user_data, dict) else user_data
-
-            enc_list = encodings[-RECENT_VECTOR_COUNT:]
-            mean_vec = np.mean(enc_list, axis=0)
+        enc_list = encodings[-RECENT_VECTOR_COUNT:]
+        mean_vec = np.mean(enc_list, axis=0)
 
-            reps[f"person_{user_id}"] = mean_vec.tolist()
-            reps[f"person_{user_id}_history"] = [e.tolist() for e in enc_list]
+        reps[f"person_{user_id}"] = mean_vec.tolist()
+        reps[f"person_{user_id}_history"] = [e.tolist() for e in enc_list]
 
     return reps
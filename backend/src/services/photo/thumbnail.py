@@ -34,8 +34,8 @@ def get_thumbnail_map() -> Dict[str, Dict]:
         thumbnail_face = None
 
         for face in all_faces:
-            # 작은 얼굴 제외
-            if face.get("too_small"):
+            # 작은 얼굴, 품질 기준 미달 얼굴(임베딩 없음) 제외
+            if face.get("too_small") or face.get("rejected"):
                 continue
 
             if (
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.utils.vector_utils import normalize_rows
+
+
+# 클러스터 순서로 정렬한 raw 행 번호(order) + 클러스터별 구간(offsets)
+# k번 클러스터 = raw[order[offsets[k]:offsets[k + 1]]]
+def cluster_order(labels, n_clusters: int):
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind="stable").astype(np.int32)
+    offsets = np.concatenate(
+        [[0], np.cumsum(np.bincount(labels, minlength=n_clusters))]
+    ).astype(np.int64)
+    return order, offsets
+
+
+# 클러스터별 raw 벡터를 정규화된 연속 배열 + 구간(offsets)으로 구성
+def build_cluster_index(raw_vectors, labels, n_clusters: int):
+    order, offsets = cluster_order(labels, n_clusters)
+    members = normalize_rows(np.asarray(raw_vectors)[order])
+    return members, offsets, order
+
+
+# 클러스터 인덱스 조회 (members가 없으면 처음 접근할 때 생성)
+# 저장소에서 읽은 클러스터는 저장된 order/offsets로 raw 행만 모으고, 구버전 pkl은 labels로 새로 정렬
+def get_cluster_index(user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    clusters = user_data.get("clusters")
+    raw_vectors = user_data.get("raw", [])
+    # labels 길이가 raw와 다르면(구버전 데이터 등) 클러스터 없이 전체 비교
+    if not clusters or len(clusters.get("labels", [])) != len(raw_vectors):
+        return None
+
+    if "members" not in clusters:
+        centroids = np.asarray(clusters["centroids"], dtype=np.float32)
+        order = clusters.get("order")
+        if order is not None and len(order) == len(raw_vectors):
+            members = normalize_rows(np.asarray(raw_vectors)[order])
+            offsets = clusters["offsets"]
+        else:
+            members, offsets, order = build_cluster_index(
+                raw_vectors, clusters["labels"], len(centroids)
+            )
+        clusters.update(
+            centroids=centroids, members=members, offsets=offsets, order=order
+        )
+
+    return clusters
+
+
+# 기존 클러스터 인덱스에 raw 끝에 추가된 행들만 끼워 넣음 (증분 클러스터링용)
+# 기존 members는 다시 정규화·정렬하지 않고, 새 행만 정규화해 각 클러스터 구간 끝에 삽입
+# (결과는 전체 labels로 build_cluster_index 한 것과 같음) → 기존 인덱스가 없으면 None
+def extend_cluster_index(clusters: Dict[str, Any], raw_vectors, new_labels):
+    raw_vectors = np.asarray(raw_vectors)
+    new_labels = np.asarray(new_labels)
+    n_old = len(raw_vectors) - len(new_labels)
+    order = clusters.get("order")
+    if order is None or len(order) != n_old:
+        return None
+
+    offsets = np.asarray(clusters["offsets"])
+    members = clusters.get("members")
+    if members is None or len(members) != n_old:
+        members = normalize_rows(raw_vectors[order])
+
+    # 새 행을 라벨 순으로 정렬 → 각자 자기 클러스터 구간 끝(offsets[label + 1]) 앞에 삽입
+    sort = np.argsort(new_labels, kind="stable")
+    positions = offsets[new_labels[sort] + 1]
+    new_rows = (n_old + sort).astype(np.int32)
+    members = np.insert(members, positions, normalize_rows(raw_vectors[new_rows]), 0)
+    order = np.insert(np.asarray(order, dtype=np.int32), positions, new_rows)
+    counts = np.bincount(new_labels, minlength=len(offsets) - 1)
+    offsets = offsets + np.concatenate([[0], np.cumsum(counts)])
+    return members, offsets, order
@@ -1,5 +1,5 @@
 import io
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -7,16 +7,91 @@ from fastapi.responses import StreamingResponse
 from sklearn.cluster import KMeans
 from sklearn.manifold import TSNE
 
+from src.services.user.cluster_index import build_cluster_index, extend_cluster_index
+from src.constants import CLUSTER_MAX_K, CLUSTER_DRIFT_THRESHOLD, CLUSTER_REFIT_RATIO
 
 # plt.style.use("seaborn")  # 스타일 지정
 
 
+# 사용자 raw 벡터 수에 맞는 클러스터 수 (데이터가 적으면 적게, CLUSTER_MAX_K 이하)
+def adaptive_n_clusters(n_vectors: int) -> int:
+    return int(min(CLUSTER_MAX_K, max(1, round(np.sqrt(n_vectors / 2)))))
+
+
+# 각 벡터와 각 중심 사이의 유클리드 거리² (n, k)
+def _squared_distances(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    d = (
+        np.sum(X**2, axis=1)[:, None]
+        - 2 * X @ centroids.T
+        + np.sum(centroids**2, axis=1)[None, :]
+    )
+    return np.maximum(d, 0)
+
+
+# 라벨 기준 벡터와 자기 클러스터 중심 사이의 평균 거리² (클러스터 응집도)
+def _mean_inertia(X: np.ndarray, centroids: np.ndarray, labels: np.ndarray) -> float:
+    if not len(X):
+        return 0.0
+    return float(np.mean(np.sum((X - centroids[labels]) ** 2, axis=1)))
+
+
+# 기존 클러스터에 새 벡터(raw[len(labels):])만 반영하는 미니배치 k-means 갱신
+# 기존 벡터의 라벨은 그대로 두고, 중심은 클러스터별 누적 개수로 가중한 평균으로 이동
+# → (centroids, labels, fit_size, inertia), 전체 재학습이 필요하면 None
+def _partial_fit(clusters: Dict[str, Any], X: np.ndarray, n_clusters: int):
+    centroids = np.asarray(clusters["centroids"], dtype=np.float32)
+    labels = np.asarray(clusters["labels"], dtype=np.int32)
+    n_old = len(labels)
+    if len(centroids) != n_clusters or n_old == 0 or n_old > len(X):
+        return None
+
+    # 구버전/저장소에서 읽은 클러스터는 재학습 정보가 없으므로 현재 상태를 기준으로 삼음
+    fit_size = clusters.get("fit_size", n_old)
+    inertia = clusters.get("inertia")
+    if inertia is None:
+        inertia = _mean_inertia(X[:n_old], centroids, labels)
+
+    new = X[n_old:]
+    if not len(new):
+        return centroids, labels, fit_size, inertia
+    if len(X) - fit_size > CLUSTER_REFIT_RATIO * fit_size:
+        return None
+
+    distances = _squared_distances(new, centroids)
+    new_labels = distances.argmin(axis=1).astype(np.int32)
+    new_inertia = float(distances[np.arange(len(new)), new_labels].mean())
+    # 새 벡터가 기존 클러스터들에서 멀리 떨어져 있으면(새 안경, 헤어스타일 등) 재학습
+    if inertia > 0 and new_inertia > CLUSTER_DRIFT_THRESHOLD * inertia:
+        return None
+
+    counts = np.bincount(labels, minlength=n_clusters).astype(np.float64)
+    new_counts = np.bincount(new_labels, minlength=n_clusters)
+    sums = np.zeros((n_clusters, X.shape[1]), dtype=np.float64)
+    np.add.at(sums, new_labels, new)
+    total = counts + new_counts
+    centroids = (centroids * counts[:, None] + sums) / np.maximum(total, 1)[:, None]
+
+    inertia = (inertia * n_old + new_inertia * len(new)) / len(X)
+    return (
+        centroids.astype(np.float32),
+        np.concatenate([labels, new_labels]),
+        fit_size,
+        inertia,
+    )
+
+
 # 클러스터링 업데이트 함수
+# 기존 클러스터가 있으면 새로 추가된 벡터만 반영해 증분 갱신
+# (중심 갱신·라벨 배정·정규화는 새 벡터만, members/offsets는 새 행만 끼워 넣음)
+# 클러스터가 없거나, 클러스터 수가 바뀌거나, 분포가 많이 달라지면 KMeans 전체 재학습
 def update_user_clusters(
     face_db: Dict[int, Dict[str, Any]],
     user_id: int,
     threshold: int = 5,  # 클러스터링에 필요한 최소 데이터 수(임계치)
-    n_clusters: int = 6,  # 클러스터의 개수(k)
+    n_clusters: Optional[
+        int
+    ] = None,  # 클러스터의 개수(k), None이면 데이터 수에 맞춰 결정
+    incremental: bool = True,  # False면 항상 전체 재학습
 ):
 
     # 사용자 원본 벡터 리스트(raw 데이터) 가져오기
@@ -30,21 +105,46 @@ def update_user_clusters(
         return f"사용자 {user_id}의 raw 벡터 수가 {threshold}개 미만이므로 클러스터링을 수행하지 않습니다."
 
     # 사용자 등록 데이터가 임계치(5개 이상)을 넘어가면 클러스터링 수행
-    X = np.array(raw_vectors)
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    kmeans.fit(X)
-
-    centroids = kmeans.cluster_centers_  # 각 클러스터의 중심 벡터
-    labels = kmeans.labels_.tolist()  # 각 벡터가 어떤 클러스터에 속하는지 (0, 1, 2 등)
+    X = np.asarray(raw_vectors, dtype=np.float32)
+    n_clusters = n_clusters or adaptive_n_clusters(len(X))
+
+    result = index = None
+    old_clusters = user_data.get("clusters")
+    if incremental and old_clusters:
+        result = _partial_fit(old_clusters, X, n_clusters)
+
+    if result is not None:
+        centroids, labels, fit_size, inertia = result
+        # 새 벡터만 기존 클러스터 구간에 끼워 넣음 (전체 재정렬·정규화 생략)
+        n_old = len(old_clusters["labels"])
+        index = extend_cluster_index(old_clusters, X, labels[n_old:])
+        mode = "증분 갱신"
+    else:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        kmeans.fit(X)
+        centroids = kmeans.cluster_centers_.astype(
+            np.float32
+        )  # 각 클러스터의 중심 벡터
+        labels = kmeans.labels_.astype(np.int32)  # 각 벡터가 속한 클러스터 (0, 1, 2 등)
+        fit_size, inertia = len(X), float(kmeans.inertia_) / len(X)
+        mode = "전체 재학습"
+
+    # 클러스터별 raw 벡터를 연속 배열로 정리 (클러스터 선택이 슬라이스 한 번)
+    if index is None:
+        index = build_cluster_index(X, labels, n_clusters)
+    members, offsets, order = index
 
     # face_db에 클러스터 결과 저장
     face_db[user_id]["clusters"] = {
-        "centroids": centroids.tolist(),
+        "centroids": centroids,
         "labels": labels,
+        "members": members,  # 정규화된 raw 벡터 (클러스터 순서로 정렬)
+        "offsets": offsets,  # k번 클러스터 = members[offsets[k]:offsets[k + 1]]
+        "order": order,  # members 각 행의 raw 행 번호 (저장소에는 order/offsets만 기록)
+        "fit_size": fit_size,  # 마지막 전체 재학습 때의 벡터 수
+        "inertia": inertia,  # 벡터-중심 평균 거리² (드리프트 판단 기준)
     }
-    return (
-        f"사용자 {user_id} 클러스터링 업데이트 완료: {n_clusters}개의 클러스터 생성됨."
-    )
+    return f"사용자 {user_id} 클러스터링 업데이트 완료: {n_clusters}개의 클러스터 ({mode})."
 
 
 # 클러스터링 시각화
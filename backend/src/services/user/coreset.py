@@ -0,0 +1,102 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.utils.vector_utils import normalize_rows
+
+
+# farthest-point(k-center) 방식으로 다양한 벡터 최대 size개 선택 → 원래 순서의 인덱스
+# 모든 벡터와 가장 비슷한 벡터(medoid)에서 시작해, 이미 고른 벡터들과 가장 먼 벡터를 차례로 추가
+# 남은 벡터가 모두 이미 고른 벡터와 같으면(정지 화면 프레임 등) size보다 적게 고르고 멈춤
+def farthest_point_coreset(
+    vectors: np.ndarray, size: int, tol: float = 1e-6
+) -> np.ndarray:
+    X = normalize_rows(vectors)
+    if len(X) <= size:
+        return np.arange(len(X))
+
+    mean = X.mean(axis=0)
+    selected = [int(np.argmax(X @ mean))]
+    # 각 벡터와 선택된 집합 사이의 최대 유사도 (작을수록 아직 대표되지 않은 벡터)
+    # 이미 고른 벡터는 +inf로 두어 다시 고르지 않음
+    coverage = X @ X[selected[0]]
+    coverage[selected[0]] = np.inf
+    for _ in range(size - 1):
+        idx = int(np.argmin(coverage))
+        if coverage[idx] >= 1 - tol:
+            break  # 남은 벡터는 모두 고른 벡터와 사실상 같음
+        selected.append(idx)
+        coverage = np.maximum(coverage, X @ X[idx])
+        coverage[idx] = np.inf
+
+    return np.sort(selected)
+
+
+# raw 벡터가 max_vectors를 넘으면 size개 coreset 인덱스, 아니면 None
+def select_coreset(
+    raw_vectors: np.ndarray, max_vectors: int, size: int
+) -> Optional[np.ndarray]:
+    if len(raw_vectors) <= max_vectors:
+        return None
+    return farthest_point_coreset(raw_vectors, size)
+
+
+# 본인 held-out 임베딩 중 갤러리와의 최대 유사도가 threshold 이상인 비율
+def self_recall(gallery: np.ndarray, holdout: np.ndarray, threshold: float) -> float:
+    if not len(holdout):
+        return 1.0
+    sims = normalize_rows(holdout) @ normalize_rows(gallery).T
+    return float(np.mean(sims.max(axis=1) >= threshold))
+
+
+# coreset 전/후 매칭 성능 비교 (사용자마다 raw의 일부를 held-out으로 떼어 평가)
+# - recall: held-out 얼굴이 본인 갤러리와 threshold 이상으로 매칭되는 비율
+# - rank1: held-out 얼굴이 전체 사용자 중 본인과 가장 유사하게 나오는 비율
+def coreset_recall_report(
+    face_db: Dict[int, dict],
+    max_vectors: int,
+    size: int,
+    threshold: float,
+    holdout_ratio: float = 0.2,
+    seed: int = 42,
+) -> dict:
+    rng = np.random.default_rng(seed)
+    galleries = {"before": {}, "after": {}}
+    holdouts = {}
+
+    for user_id, user_data in face_db.items():
+        raw = np.asarray(user_data["raw"], dtype=np.float32)
+        if len(raw) < 2:
+            continue
+        order = rng.permutation(len(raw))
+        n_holdout = max(1, int(len(raw) * holdout_ratio))
+        holdouts[user_id] = raw[order[:n_holdout]]
+        train = raw[np.sort(order[n_holdout:])]
+
+        keep = select_coreset(train, max_vectors, size)
+        galleries["before"][user_id] = normalize_rows(train)
+        galleries["after"][user_id] = normalize_rows(
+            train if keep is None else train[keep]
+        )
+
+    report = {"users": len(holdouts)}
+    for stage, gallery in galleries.items():
+        user_ids = list(gallery.keys())
+        recalls, hits, total = [], 0, 0
+        for user_id, holdout in holdouts.items():
+            recalls.append(self_recall(gallery[user_id], holdout, threshold))
+
+            # 전체 사용자 중 본인이 1등인지
+            queries = normalize_rows(holdout)
+            scores = np.stack(
+                [(queries @ gallery[uid].T).max(axis=1) for uid in user_ids], axis=1
+            )
+            hits += int(np.sum(np.asarray(user_ids)[scores.argmax(axis=1)] == user_id))
+            total += len(holdout)
+
+        report[stage] = {
+            "vectors": int(sum(len(g) for g in gallery.values())),
+            "recall": round(float(np.mean(recalls)), 4) if recalls else None,
+            "rank1": round(hits / total, 4) if total else None,
+        }
+    return report
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from src.services.user.insightface_wrapper import Face, face_engine
+from src.services.user.face_quality import quality_stats
+from src.constants import (
+    FACE_PIPELINE_PROFILES,
+    FACE_QUALITY_GATES,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MAX_MB,
+)
+
+
+# 이미지 md5 + 모델 버전 → 얼굴 목록(bbox/kps/det_score/embedding...) 디스크 캐시
+# 크기 상한을 넘으면 가장 오래 사용하지 않은 파일부터 삭제 (LRU)
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # 파일명 → 크기
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_index()
+
+    # 기존 캐시 파일을 최근 사용 시각 순으로 불러옴 (재시작 후에도 LRU 순서 유지)
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    # md5(이미지 바이트 + 버전) — 이어 붙이면 업로드 이미지 전체가 복사되므로 나눠서 update
+    # (결과는 이어 붙인 바이트의 md5와 같아 기존 캐시 파일 이름도 그대로 유효)
+    def _key(self, image_bytes: bytes, version: str) -> str:
+        digest = hashlib.md5(image_bytes)
+        digest.update(version.encode())
+        return digest.hexdigest() + ".pkl"
+
+    # 캐시된 얼굴 목록 (없으면 None)
+    # version: 추론 결과를 바꾸는 설정 조합 (모델 버전 + 품질 기준)
+    def get(self, image_bytes: bytes, version: str):
+        if not self.enabled:
+            return None
+
+        name = self._key(image_bytes, version)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+
+        try:
+            with open(path, "rb") as f:
+                faces = [Face(face) for face in pickle.load(f)]
+            os.utime(path)  # 사용 시각 갱신
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # 외부에서 지워졌거나 손상된 파일은 캐시 미스로 처리
+            self._discard(name)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return faces
+
+    # 얼굴 목록 저장 (임시 파일에 쓴 뒤 교체 → 동시에 읽어도 깨진 파일 없음)
+    def put(self, image_bytes: bytes, faces: list, version: str):
+        if not self.enabled:
+            return
+
+        name = self._key(image_bytes, version)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump([dict(face) for face in faces], f)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            evicted = self._evict()
+
+        for old_name in evicted:
+            try:
+                os.remove(os.path.join(self.cache_dir, old_name))
+            except FileNotFoundError:
+                pass
+
+    # 크기 상한을 넘은 만큼 오래된 항목 제거 (lock 안에서 호출, 삭제할 파일명 반환)
+    def _evict(self) -> List[str]:
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(name)
+        return evicted
+
+    def _discard(self, name: str):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "size_mb": round(self._total_bytes / 2**20, 2),
+                "max_mb": round(self.max_bytes / 2**20, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 전역 인스턴스
+embedding_cache = EmbeddingCache(
+    EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_MB * 2**20, EMBEDDING_CACHE_ENABLED
+)
+
+
+# 캐시에 있는 이미지는 추론 생략, 없는 이미지만 모아 배치 검출·임베딩
+# pipeline: FACE_PIPELINE_PROFILES / FACE_QUALITY_GATES의 키 (attendance, album, register)
+# images: 이미 디코딩한 이미지가 있으면 전달 (없으면 캐시 미스만 2단계 디코딩)
+def get_faces_cached(
+    images_bytes: List[bytes],
+    pipeline: str,
+    images: Optional[List[np.ndarray]] = None,
+) -> List[list]:
+    profile = FACE_PIPELINE_PROFILES[pipeline]
+    quality = FACE_QUALITY_GATES[pipeline]
+    version = (
+        f"{face_engine.model_version(profile)}:{json.dumps(quality, sort_keys=True)}"
+    )
+
+    results = [embedding_cache.get(b, version) for b in images_bytes]
+    misses = [i for i, faces in enumerate(results) if faces is None]
+
+    if misses:
+        if images is not None:
+            detected = face_engine.get_faces_batch(
+                [images[i] for i in misses], profile=profile, quality=quality
+            )
+        else:
+            detected = face_engine.get_faces_encoded_batch(
+                [images_bytes[i] for i in misses], profile=profile, quality=quality
+            )
+
+        for i, faces in zip(misses, detected):
+            results[i] = faces
+            embedding_cache.put(images_bytes[i], faces, version)
+
+    quality_stats.record(pipeline, results)
+    return results
@@ -0,0 +1,79 @@
+import threading
+from collections import defaultdict
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+# 5점 랜드마크(왼눈, 오른눈, 코, 입 왼쪽, 입 오른쪽)로 좌우 회전 정도 추정
+# 눈 축 기준으로 코가 두 눈 중앙에서 벗어난 거리 / 눈 사이 거리 (정면 0, 옆얼굴일수록 커짐)
+def estimate_yaw(kps: np.ndarray) -> float:
+    eye_mid = (kps[0] + kps[1]) / 2
+    eye_vec = kps[1] - kps[0]
+    eye_dist = np.linalg.norm(eye_vec)
+    if eye_dist == 0:
+        return float("inf")
+    return float(abs(np.dot(kps[2] - eye_mid, eye_vec)) / eye_dist**2)
+
+
+# 정렬 크롭의 선명도 (Laplacian 분산, 낮을수록 흐림)
+def blur_score(crop: np.ndarray) -> float:
+    gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+# 임베딩 전 얼굴 품질 검사 (FACE_QUALITY_GATES의 파이프라인별 설정, 0이면 해당 검사 생략)
+class QualityGate:
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        self.min_size = config.get("min_size", 0)
+        self.min_det_score = config.get("min_det_score", 0)
+        self.max_yaw = config.get("max_yaw", 0)
+        self.min_blur = config.get("min_blur", 0)
+
+    # 검출 결과만으로 판단 가능한 검사 (크롭 전) → 탈락 사유 또는 None
+    def check_face(self, face) -> Optional[str]:
+        x1, y1, x2, y2 = face.bbox
+        if self.min_size and min(x2 - x1, y2 - y1) < self.min_size:
+            return "size"
+        if self.min_det_score and face.det_score < self.min_det_score:
+            return "det_score"
+        if self.max_yaw and estimate_yaw(face.kps) > self.max_yaw:
+            return "pose"
+        return None
+
+    # 정렬 크롭으로 판단하는 검사 (임베딩 전) → 탈락 사유 또는 None
+    def check_crop(self, crop: np.ndarray) -> Optional[str]:
+        if self.min_blur and blur_score(crop) < self.min_blur:
+            return "blur"
+        return None
+
+
+# 파이프라인별 품질 검사 통계 (전체 얼굴 수, 탈락 사유별 수)
+class QualityStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: defaultdict(int))
+
+    def record(self, pipeline: str, batch_faces: List[list]):
+        with self._lock:
+            counts = self._counts[pipeline]
+            for faces in batch_faces:
+                for face in faces:
+                    counts["faces"] += 1
+                    if face.rejected:
+                        counts["skipped"] += 1
+                        counts[f"skipped_{face.rejected}"] += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {pipeline: dict(c) for pipeline, c in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+# 전역 인스턴스
+quality_stats = QualityStats()
@@ -0,0 +1,83 @@
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from src.services.user.insightface_wrapper import Face
+from src.constants import VIDEO_DETECT_EVERY, VIDEO_TRACK_MAX_ERROR
+
+_LK_PARAMS = {
+    "winSize": (21, 21),
+    "maxLevel": 3,
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+}
+
+
+def _gray(frame: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+
+# 등록 영상 얼굴 추적 (얼굴이 하나인 영상 기준)
+# 검출은 detect_every 프레임마다 하고, 그 사이에는 이전 얼굴의 5점 kps를 광류(Lucas-Kanade)로 옮김
+# 정방향→역방향 추적 오차가 눈 사이 거리 × max_error를 넘으면 추적 실패로 보고 다시 검출
+# kps만 있으면 정렬 크롭을 만들 수 있으므로 추적한 프레임은 검출 없이 바로 인식 모델로 보냄
+class FaceTracker:
+    def __init__(
+        self,
+        detect_every: int = VIDEO_DETECT_EVERY,
+        max_error: float = VIDEO_TRACK_MAX_ERROR,
+    ):
+        self.detect_every = detect_every
+        self.max_error = max_error
+        self._face: Optional[Face] = None
+        self._gray: Optional[np.ndarray] = None
+        self._age = 0  # 마지막 검출 이후 추적한 프레임 수
+        self.stats = {"detected": 0, "tracked": 0, "lost": 0}
+
+    # 검출 결과로 추적 대상 재설정 (품질 기준을 통과한 얼굴이 하나일 때만 추적)
+    def update(self, frame: np.ndarray, faces: List[Face]):
+        self.stats["detected"] += 1
+        single = len(faces) == 1 and not faces[0].rejected
+        self._face = faces[0] if single else None
+        self._gray = _gray(frame) if single else None
+        self._age = 0
+
+    # 이전 얼굴을 현재 프레임으로 옮긴 Face (bbox, kps, det_score) → 검출이 필요하면 None
+    def track(self, frame: np.ndarray) -> Optional[Face]:
+        if self._face is None or self._age + 1 >= self.detect_every:
+            return None
+
+        gray = _gray(frame)
+        prev_pts = np.asarray(self._face.kps, dtype=np.float32).reshape(-1, 1, 2)
+        pts, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._gray, gray, prev_pts, None, **_LK_PARAMS
+        )
+        back, status_back, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._gray, pts, None, **_LK_PARAMS
+        )
+
+        eye_dist = float(np.linalg.norm(prev_pts[1] - prev_pts[0])) or 1.0
+        fb_error = np.linalg.norm(back - prev_pts, axis=2).max() / eye_dist
+        matrix = None
+        if status.all() and status_back.all() and fb_error <= self.max_error:
+            matrix, _ = cv2.estimateAffinePartial2D(prev_pts, pts)
+        if matrix is None:
+            self.stats["lost"] += 1
+            self._face = None
+            return None
+
+        # bbox는 중심만 같은 변환으로 옮기고 크기는 배율만 반영 (회전으로 박스가 부풀지 않게)
+        x1, y1, x2, y2 = np.asarray(self._face.bbox, dtype=np.float32)[:4]
+        center = matrix[:, :2] @ [(x1 + x2) / 2, (y1 + y2) / 2] + matrix[:, 2]
+        half = np.array([x2 - x1, y2 - y1]) * np.sqrt(np.linalg.det(matrix[:, :2])) / 2
+
+        face = Face(
+            bbox=np.concatenate([center - half, center + half]).astype(np.float32),
+            kps=pts.reshape(-1, 2),
+            det_score=self._face.det_score,
+            tracked=True,
+        )
+        self._face, self._gray = face, gray
+        self._age += 1
+        self.stats["tracked"] += 1
+        return face
@@ -0,0 +1,63 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from src.utils.vector_utils import EMBEDDING_DIM
+from src.constants import VIDEO_DEDUP_HASH_DISTANCE, VIDEO_DEDUP_SIMILARITY
+
+
+# 64비트 difference hash (9×8 흑백 축소 이미지에서 가로로 이웃한 픽셀의 밝기 비교)
+def dhash(image: np.ndarray) -> int:
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# 등록 영상 프레임 중복 검사 (이미 받아들인 프레임과 거의 같은 프레임은 증강·저장 생략)
+# 1) 검출 전: 프레임 dHash가 받아들인 프레임과 max_distance 비트 이하로 다르면 중복
+# 2) 검출 후: 얼굴 임베딩이 받아들인 얼굴과 코사인 유사도 max_similarity 이상이면 중복
+# 0이면 해당 검사 생략
+class FrameNoveltyFilter:
+    def __init__(
+        self,
+        max_distance: int = VIDEO_DEDUP_HASH_DISTANCE,
+        max_similarity: float = VIDEO_DEDUP_SIMILARITY,
+    ):
+        self.max_distance = max_distance
+        self.max_similarity = max_similarity
+        self._hashes = []
+        self._embeddings = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        self.skipped = {"hash": 0, "embedding": 0}
+
+    # 프레임 단위 검사 → 새 프레임이면 hash 값, 중복이면 None
+    def check_frame(self, frame: np.ndarray) -> Optional[int]:
+        frame_hash = dhash(frame)
+        if self.max_distance and any(
+            hamming(frame_hash, h) <= self.max_distance for h in self._hashes
+        ):
+            self.skipped["hash"] += 1
+            return None
+        return frame_hash
+
+    # 얼굴 임베딩 검사 → 새 얼굴이면 True (임베딩이 없으면 검사하지 않음)
+    def check_embedding(self, embedding: Optional[np.ndarray]) -> bool:
+        if embedding is None or not self.max_similarity or not len(self._embeddings):
+            return True
+        query = embedding / (np.linalg.norm(embedding) + 1e-12)
+        if float(np.max(self._embeddings @ query)) >= self.max_similarity:
+            self.skipped["embedding"] += 1
+            return False
+        return True
+
+    # 두 검사를 통과해 처리하기로 한 프레임 기록
+    def accept(self, frame_hash: int, embedding: Optional[np.ndarray] = None):
+        self._hashes.append(frame_hash)
+        if embedding is not None:
+            query = embedding / (np.linalg.norm(embedding) + 1e-12)
+            self._embeddings = np.vstack([self._embeddings, query.astype(np.float32)])
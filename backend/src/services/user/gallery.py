@@ -0,0 +1,217 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.vector_utils import EMBEDDING_DIM, normalize_rows
+from src.services.user.cluster_index import get_cluster_index
+from src.services.user.ivf_index import IVFIndex, default_nlist, train_coarse_quantizer
+from src.constants import (
+    GALLERY_IVF_MIN_USERS,
+    GALLERY_IVF_NLIST,
+    GALLERY_IVF_NPROBE,
+)
+
+
+# 사용자 한 명의 갤러리 블록 (정규화된 raw 벡터 + 클러스터 정보)
+class _UserBlock:
+    def __init__(self, user_data: Dict[str, Any]):
+        self.labels = None
+        self.centroids = None
+
+        clusters = get_cluster_index(user_data)
+        if clusters is not None:
+            # 클러스터 순서로 정렬·정규화된 raw 벡터를 그대로 사용
+            offsets = clusters["offsets"]
+            self.vectors = clusters["members"]
+            self.labels = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            self.centroids = normalize_rows(clusters["centroids"])
+            return
+
+        raw_vectors = user_data.get("raw", [])
+        self.vectors = (
+            normalize_rows(raw_vectors)
+            if len(raw_vectors)
+            else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+
+
+# 전체 사용자 블록을 이어 붙인 읽기 전용 스냅샷
+class GallerySnapshot:
+    def __init__(self, blocks: Dict[int, _UserBlock]):
+        blocks = {uid: b for uid, b in blocks.items() if len(b.vectors)}
+
+        self.user_ids: List[int] = list(blocks.keys())
+        counts = [len(b.vectors) for b in blocks.values()]
+
+        # 행 → 사용자 인덱스 (행은 사용자별로 연속 배치)
+        self.user_starts = np.cumsum([0] + counts[:-1]).astype(np.intp)
+        self.row_users = np.repeat(np.arange(len(counts)), counts)
+        self.matrix = (
+            np.concatenate([b.vectors for b in blocks.values()])
+            if blocks
+            else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+
+        # 클러스터링된 사용자의 centroid 행렬 + 각 raw 행이 속한 centroid 인덱스
+        centroid_blocks = []
+        centroid_starts = []
+        centroid_users = []
+        row_centroids = np.full(len(self.matrix), -1, dtype=np.intp)
+        self.user_clustered = np.zeros(len(counts), dtype=bool)
+        n_centroids = 0
+        for idx, block in enumerate(blocks.values()):
+            if block.centroids is None:
+                continue
+            self.user_clustered[idx] = True
+            start = self.user_starts[idx]
+            row_centroids[start : start + len(block.vectors)] = (
+                n_centroids + block.labels
+            )
+            centroid_blocks.append(block.centroids)
+            centroid_starts.append(n_centroids)
+            centroid_users.append(np.full(len(block.centroids), len(centroid_users)))
+            n_centroids += len(block.centroids)
+
+        self.row_centroids = row_centroids
+        self.centroids = (
+            np.concatenate(centroid_blocks)
+            if centroid_blocks
+            else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        )
+        self.centroid_starts = np.asarray(centroid_starts, dtype=np.intp)
+        self.centroid_groups = (
+            np.concatenate(centroid_users) if centroid_users else np.empty(0, np.intp)
+        )
+
+        # 사용자 수가 많을 때만 IVF 인덱스 사용 (FaceGallery가 채움)
+        self.ivf: Optional[IVFIndex] = None
+
+    def __len__(self):
+        return len(self.matrix)
+
+    # coarse quantizer 학습용 포인트: 사용자 centroid + 클러스터 없는 사용자의 평균 벡터
+    def coarse_points(self) -> np.ndarray:
+        means = np.add.reduceat(self.matrix, self.user_starts, axis=0)
+        means = normalize_rows(means[~self.user_clustered])
+        return np.concatenate([self.centroids, means])
+
+    # 얼굴 임베딩(F개) × 사용자(U명) 유사도 행렬 계산
+    # use_clusters: 클러스터/IVF 기반 후보 축소 사용 여부 (False면 전체 raw와 정확히 비교)
+    def score_users(self, queries: np.ndarray, use_clusters: bool = True) -> np.ndarray:
+        if use_clusters and self.ivf is not None:
+            # 대규모 갤러리: nprobe개 리스트의 후보만 정확히 비교
+            return self.ivf.search(
+                queries,
+                self.row_users,
+                len(self.user_ids),
+                GALLERY_IVF_NPROBE,
+            )
+
+        sims = queries @ self.matrix.T  # (F, N) 한 번의 행렬곱
+
+        if use_clusters and len(self.centroids):
+            # 사용자별로 가장 가까운 클러스터에 속한 raw 벡터만 남김
+            centroid_sims = queries @ self.centroids.T  # (F, M)
+            best = np.maximum.reduceat(centroid_sims, self.centroid_starts, axis=1)
+            is_best = centroid_sims >= best[:, self.centroid_groups]
+
+            clustered = self.row_centroids >= 0
+            allowed = np.ones_like(sims, dtype=bool)
+            allowed[:, clustered] = is_best[:, self.row_centroids[clustered]]
+            sims = np.where(allowed, sims, -np.inf)
+
+        # 사용자별 최대 유사도
+        return np.maximum.reduceat(sims, self.user_starts, axis=1)
+
+
+# 출석체크용 얼굴 갤러리 (face_db와 동기화)
+class FaceGallery:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks: Dict[int, _UserBlock] = {}
+        self._snapshot: Optional[GallerySnapshot] = None
+        self._coarse_centers: Optional[np.ndarray] = None
+        self._coarse_trained_on = 0  # coarse quantizer 학습 당시 포인트 수
+        self._coarse_training = False  # 백그라운드 재학습 진행 중
+
+    # face_db 전체로 갤러리 재구성 (서버 시작 시)
+    def rebuild(self, face_db: Dict[int, Dict[str, Any]]):
+        blocks = {uid: _UserBlock(data) for uid, data in face_db.items()}
+        with self._lock:
+            self._blocks = blocks
+            self._snapshot = None
+
+    # 특정 사용자만 갱신 (얼굴 등록 시)
+    def update_user(self, user_id: int, user_data: Dict[str, Any]):
+        block = _UserBlock(user_data)
+        with self._lock:
+            self._blocks[user_id] = block
+            self._snapshot = None
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            self._blocks.pop(user_id, None)
+            self._snapshot = None
+
+    # 변경이 있을 때만 스냅샷을 다시 이어 붙임
+    def snapshot(self) -> GallerySnapshot:
+        with self._lock:
+            if self._snapshot is None:
+                snap = GallerySnapshot(self._blocks)
+                if len(snap.user_ids) >= GALLERY_IVF_MIN_USERS:
+                    centers = self._coarse_quantizer(snap)
+                    if centers is not None:
+                        snap.ivf = IVFIndex(centers, snap.matrix)
+                self._snapshot = snap
+            return self._snapshot
+
+    # 현재 coarse quantizer (잠금 안에서 호출)
+    # 포인트 수가 학습 당시의 2배 이상 변했으면 백그라운드 스레드에서 재학습 시작
+    # 재학습이 끝날 때까지는 이전 quantizer를 쓰고, 아직 없으면 None (IVF 없이 전체 비교)
+    def _coarse_quantizer(self, snap: GallerySnapshot) -> Optional[np.ndarray]:
+        n_points = len(snap.centroids) + int(np.sum(~snap.user_clustered))
+        trained = self._coarse_trained_on
+        stale = (
+            self._coarse_centers is None
+            or n_points > 2 * trained
+            or n_points < trained // 2
+        )
+        if stale and not self._coarse_training:
+            self._coarse_training = True
+            threading.Thread(
+                target=self._train_coarse,
+                args=(snap.coarse_points(),),
+                name="gallery-coarse-quantizer",
+                daemon=True,
+            ).start()
+        return self._coarse_centers
+
+    # coarse quantizer 학습 (KMeans) → 교체 후 다음 요청에서 새 quantizer로 스냅샷 재구성
+    def _train_coarse(self, points: np.ndarray):
+        centers = None
+        try:
+            nlist = GALLERY_IVF_NLIST or default_nlist(len(points))
+            centers = train_coarse_quantizer(points, nlist)
+        except Exception as e:
+            print(f"⚠️ IVF coarse quantizer 학습 실패: {e}")
+        with self._lock:
+            self._coarse_training = False
+            if centers is not None:
+                self._coarse_centers = centers
+                self._coarse_trained_on = len(points)
+                self._snapshot = None
+
+    # 얼굴 임베딩들을 모든 사용자와 비교 → (user_id 목록, F×U 유사도 행렬)
+    def match(
+        self, embeddings: Iterable[np.ndarray], use_clusters: bool = True
+    ) -> Tuple[List[int], np.ndarray]:
+        snap = self.snapshot()
+        queries = normalize_rows(list(embeddings))
+        if not len(snap) or not len(queries):
+            return [], np.empty((len(queries), 0), dtype=np.float32)
+        return snap.user_ids, snap.score_users(queries, use_clusters)
+
+
+# 전역 인스턴스
+face_gallery = FaceGallery()
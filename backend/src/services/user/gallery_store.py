@@ -0,0 +1,316 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.vector_utils import EMBEDDING_DIM
+from src.services.user.cluster_index import cluster_order
+
+try:
+    import fcntl  # 여러 워커 프로세스가 같은 저장소에 쓸 때 파일 잠금 (POSIX)
+except ImportError:
+    fcntl = None
+
+INDEX_FILE = "gallery_index.npz"
+LOCK_FILE = "gallery.lock"
+ROW_BYTES = EMBEDDING_DIM * 4  # float32 한 행
+
+
+# 얼굴 갤러리 바이너리 저장소
+# - gallery_vectors.<gen>.f32: 모든 사용자 raw 벡터를 이어 붙인 float32 파일 (append-only, mmap)
+# - gallery_index.npz: 사용자별 구간(offset, count)
+#   + 클러스터(centroids, labels, order, offsets, 증분 갱신용 fit_size/inertia)
+# 인덱스는 임시 파일에 쓴 뒤 교체하므로, 쓰는 도중에 죽어도 이전 상태로 읽힘
+# (인덱스에 없는 벡터 파일 꼬리는 무시되고 다음 추가 때 잘려 나감)
+class GalleryStore:
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.generation = 0
+        self.rows = 0  # 인덱스가 가리키는 유효 행 수 (벡터 파일 길이)
+        self.segments: Dict[int, List[Tuple[int, int]]] = {}  # user_id → 구간들
+        self.clusters: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    @property
+    def vectors_path(self) -> str:
+        return self._path(f"gallery_vectors.{self.generation}.f32")
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path(INDEX_FILE))
+
+    # 프로세스 간 쓰기 잠금 (잠금 안에서 디스크 인덱스를 다시 읽어 다른 워커의 추가분 반영)
+    @contextmanager
+    def _write_lock(self):
+        with self._lock, open(self._path(LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self.exists():
+                    self._read_index()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        self._reset()
+        # NpzFile은 키를 읽을 때마다 zip에서 다시 풀기 때문에 배열을 한 번씩만 꺼냄
+        with np.load(self._path(INDEX_FILE)) as npz:
+            index = {key: npz[key] for key in npz.files}
+
+        self.generation = int(index["generation"])
+        self.rows = int(index["rows"])
+
+        for uid, offset, count in zip(
+            index["seg_users"].tolist(),
+            index["seg_offsets"].tolist(),
+            index["seg_counts"].tolist(),
+        ):
+            self.segments.setdefault(uid, []).append((offset, count))
+
+        k_splits = np.cumsum(index["cl_k"])[:-1]
+        label_splits = np.cumsum(index["cl_label_counts"])[:-1]
+        centroids = np.split(index["cl_centroids"], k_splits)
+        labels = np.split(index["cl_labels"], label_splits)
+        # order/offsets가 없는 이전 형식 인덱스는 labels로 다시 계산
+        if "cl_order" in index:
+            orders = np.split(index["cl_order"], label_splits)
+            offsets = np.split(
+                index["cl_offsets"], k_splits + np.arange(1, len(k_splits) + 1)
+            )
+        else:
+            orders = offsets = [None] * len(centroids)
+        n_users = len(centroids)
+        fit_sizes = index["cl_fit_size"] if "cl_fit_size" in index else [-1] * n_users
+        inertias = index["cl_inertia"] if "cl_inertia" in index else [np.nan] * n_users
+        for uid, c, l, o, off, fit_size, inertia in zip(
+            index["cl_users"].tolist(),
+            centroids,
+            labels,
+            orders,
+            offsets,
+            fit_sizes,
+            inertias,
+        ):
+            if o is None:
+                o, off = cluster_order(l, len(c))
+            self.clusters[uid] = {
+                "centroids": c,
+                "labels": l,
+                "order": o,
+                "offsets": off,
+            }
+            # 재학습 정보가 없으면(-1, nan) 다음 증분 갱신 때 현재 상태를 기준으로 삼음
+            if fit_size >= 0:
+                self.clusters[uid]["fit_size"] = int(fit_size)
+            if not np.isnan(inertia):
+                self.clusters[uid]["inertia"] = float(inertia)
+
+    # 현재 상태를 인덱스 파일로 원자적으로 기록
+    def _write_index(self):
+        seg_items = [
+            (uid, offset, count)
+            for uid, segs in self.segments.items()
+            for offset, count in segs
+        ]
+        cl_users = list(self.clusters.keys())
+        cl_items = list(self.clusters.values())
+
+        # 사용자별 클러스터 배열을 하나로 이어 붙임 (개수는 cl_k, cl_label_counts로 나눔)
+        def concat(key, dtype, width=None):
+            if cl_items:
+                return np.concatenate([c[key] for c in cl_items]).astype(dtype)
+            return np.empty((0, width) if width else 0, dtype=dtype)
+
+        tmp_path = self._path(INDEX_FILE + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            generation=np.int64(self.generation),
+            rows=np.int64(self.rows),
+            seg_users=np.array([s[0] for s in seg_items], dtype=np.int64),
+            seg_offsets=np.array([s[1] for s in seg_items], dtype=np.int64),
+            seg_counts=np.array([s[2] for s in seg_items], dtype=np.int64),
+            cl_users=np.array(cl_users, dtype=np.int64),
+            cl_k=np.array([len(c["centroids"]) for c in cl_items], dtype=np.int64),
+            cl_centroids=concat("centroids", np.float32, EMBEDDING_DIM),
+            cl_label_counts=np.array(
+                [len(c["labels"]) for c in cl_items], dtype=np.int64
+            ),
+            cl_labels=concat("labels", np.int32),
+            cl_order=concat("order", np.int32),  # 사용자마다 labels와 같은 길이
+            cl_offsets=concat("offsets", np.int64),  # 사용자마다 k + 1개
+            cl_fit_size=np.array(
+                [c.get("fit_size", -1) for c in cl_items], dtype=np.int64
+            ),
+            cl_inertia=np.array(
+                [c.get("inertia", np.nan) for c in cl_items], dtype=np.float64
+            ),
+        )
+        os.replace(tmp_path, self._path(INDEX_FILE))
+
+    # 벡터 파일을 읽기 전용으로 매핑 (여러 프로세스가 같은 페이지 캐시를 공유)
+    def _map_vectors(self) -> np.ndarray:
+        if self.rows == 0:
+            return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        return np.memmap(
+            self.vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(self.rows, EMBEDDING_DIM),
+        )
+
+    # 저장소 전체 → face_db 형식 {user_id: {"raw": ndarray, "clusters": {...}}}
+    # 사용자 벡터가 한 구간이면 mmap 뷰 그대로 (복사 없음), 여러 구간이면 이어 붙임
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            self._read_index()
+            vectors = self._map_vectors()
+
+            face_db = {}
+            for uid, segs in self.segments.items():
+                parts = [vectors[offset : offset + count] for offset, count in segs]
+                raw = parts[0] if len(parts) == 1 else np.concatenate(parts)
+                face_db[uid] = {"raw": raw}
+
+                if uid in self.clusters:
+                    # members(정규화 벡터)는 raw와 중복이라 저장하지 않고, 처음 조회할 때
+                    # 저장된 order로 raw 행만 모아서 만듦 (cluster_index.get_cluster_index)
+                    face_db[uid]["clusters"] = dict(self.clusters[uid])
+            return face_db
+
+    # 벡터 파일 끝에 행 추가 (쓰기 잠금 안에서 호출) → 추가된 구간
+    def _write_rows(self, vectors) -> Tuple[int, int]:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(
+            -1, EMBEDDING_DIM
+        )
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(self.rows * ROW_BYTES)  # 이전에 실패한 쓰기의 꼬리 제거
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        segment = (self.rows, len(vectors))
+        self.rows += len(vectors)
+        return segment
+
+    # 사용자 벡터 추가 (+ 최신 클러스터 결과 저장)
+    def append(
+        self,
+        user_id: int,
+        vectors: np.ndarray,
+        clusters: Optional[Dict[str, Any]] = None,
+    ):
+        with self._write_lock():
+            self.segments.setdefault(user_id, []).append(self._write_rows(vectors))
+            self._set_clusters(user_id, clusters)
+            self._write_index()
+
+    # 사용자 벡터 전체 교체 (coreset 압축 등) — 새 구간을 쓰고 이전 구간은 버림
+    # (버려진 행은 다음 compaction 때 정리됨)
+    def replace_user(
+        self,
+        user_id: int,
+        vectors: np.ndarray,
+        clusters: Optional[Dict[str, Any]] = None,
+    ):
+        with self._write_lock():
+            self.segments[user_id] = [self._write_rows(vectors)]
+            self._set_clusters(user_id, clusters)
+            self._write_index()
+
+    # 클러스터 결과만 교체 (벡터는 그대로)
+    def update_clusters(self, user_id: int, clusters: Optional[Dict[str, Any]]):
+        with self._write_lock():
+            if user_id not in self.segments:
+                return
+            self._set_clusters(user_id, clusters)
+            self._write_index()
+
+    def _set_clusters(self, user_id: int, clusters: Optional[Dict[str, Any]]):
+        if clusters:
+            centroids = np.asarray(clusters["centroids"], dtype=np.float32)
+            labels = np.asarray(clusters["labels"], dtype=np.int32)
+            if "order" in clusters:
+                order, offsets = clusters["order"], clusters["offsets"]
+            else:
+                order, offsets = cluster_order(labels, len(centroids))
+            self.clusters[user_id] = {
+                "centroids": centroids,
+                "labels": labels,
+                "order": np.asarray(order, dtype=np.int32),
+                "offsets": np.asarray(offsets, dtype=np.int64),
+            }
+            for key in ("fit_size", "inertia"):
+                if clusters.get(key) is not None:
+                    self.clusters[user_id][key] = clusters[key]
+        else:
+            self.clusters.pop(user_id, None)
+
+    def remove_user(self, user_id: int):
+        with self._write_lock():
+            self.segments.pop(user_id, None)
+            self.clusters.pop(user_id, None)
+            self._write_index()
+
+    # 사용자 벡터를 연속 구간으로 다시 쓴 새 세대 파일 생성 → 인덱스 교체 → 이전 파일 삭제
+    # (이전 파일을 매핑하고 있던 프로세스는 삭제 후에도 기존 매핑을 그대로 읽을 수 있음)
+    def compact(self, face_db: Optional[Dict[int, Dict[str, Any]]] = None):
+        with self._write_lock():
+            old_path = self.vectors_path if self.rows else None
+            if face_db is None:
+                vectors = self._map_vectors()
+                users = {
+                    uid: np.concatenate([vectors[o : o + c] for o, c in segs])
+                    for uid, segs in self.segments.items()
+                }
+            else:
+                users = {uid: data["raw"] for uid, data in face_db.items()}
+                self.clusters = {}
+                for uid, data in face_db.items():
+                    self._set_clusters(uid, data.get("clusters"))
+
+            self.generation += 1
+            self.segments, self.rows = {}, 0
+            with open(self.vectors_path, "wb") as f:
+                for uid, raw in users.items():
+                    raw = np.ascontiguousarray(raw, dtype=np.float32).reshape(
+                        -1, EMBEDDING_DIM
+                    )
+                    if not len(raw):
+                        continue
+                    f.write(raw.tobytes())
+                    self.segments[uid] = [(self.rows, len(raw))]
+                    self.rows += len(raw)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._write_index()
+            if old_path and old_path != self.vectors_path:
+                os.remove(old_path)
+
+    # 구간이 사용자 수보다 많이 쪼개졌거나 버려진 행이 많으면 compaction 필요
+    def needs_compaction(self, max_dead_ratio: float = 0.25) -> bool:
+        n_segments = sum(len(segs) for segs in self.segments.values())
+        live_rows = sum(c for segs in self.segments.values() for _, c in segs)
+        dead_ratio = 1 - live_rows / self.rows if self.rows else 0
+        return (
+            n_segments > 2 * max(1, len(self.segments)) or dead_ratio > max_dead_ratio
+        )
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "users": len(self.segments),
+            "rows": self.rows,
+            "segments": sum(len(segs) for segs in self.segments.values()),
+            "clustered_users": len(self.clusters),
+            "size_mb": round(self.rows * ROW_BYTES / 2**20, 2),
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from src.constants import INFERENCE_WORKERS, INFERENCE_MAX_QUEUE
+
+
+# 얼굴 추론 전용 스레드 풀
+# - 디코딩/검출/임베딩 같은 무거운 동기 작업을 이벤트 루프 밖에서 실행
+# - 모든 워커가 face_engine의 ONNX 세션 하나를 공유 (session.run은 GIL을 놓고 실행됨)
+# - 대기열이 가득 차면 503으로 거절해서 요청이 무한정 쌓이지 않게 함
+class InferenceExecutor:
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0  # 제출되었지만 끝나지 않은 작업 수 (대기 + 실행 중)
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # fn(*args)를 추론 풀에서 실행하고 결과를 기다림
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="얼굴 인식 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                )
+            self._pending += 1
+
+        submitted_at = time.perf_counter()
+
+        def task():
+            wait = time.perf_counter() - submitted_at
+            with self._lock:
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    # 대기열 깊이와 대기 시간 통계
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg_ms": (
+                    round(self._wait_total * 1000 / started, 2) if started else 0.0
+                ),
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 전역 인스턴스
+inference_pool = InferenceExecutor(INFERENCE_WORKERS, INFERENCE_MAX_QUEUE)
@@ -0,0 +1,287 @@
+"""
+얼굴 추론 서버 프로세스
+
+uvicorn 워커가 여러 개여도 buffalo_l 모델은 이 프로세스에 한 번만 올라감.
+API 워커는 디코딩된 이미지를 공유 메모리에 쓰고, 이름/위치만 Unix 소켓으로 보냄
+(이미지 자체는 직렬화하지 않음). 결과(bbox, kps, embedding)만 돌려받음.
+
+실행 (backend 디렉토리에서):
+    INFERENCE_SERVER_SOCKET=/tmp/moimz-face.sock python -m src.services.user.inference_server
+API 서버도 같은 INFERENCE_SERVER_SOCKET 값으로 실행하면 RemoteFaceEngine을 사용함.
+"""
+
+import atexit
+import os
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+
+import numpy as np
+
+from src.services.user.insightface_wrapper import Face, FaceEngine
+from src.constants import INFERENCE_SERVER_SOCKET
+
+
+# 공유 메모리에 올린 이미지들의 위치 정보 → 서버 쪽에서 복사 없이 ndarray로 해석
+def _image_views(shm: SharedMemory, layout: list) -> List[Optional[np.ndarray]]:
+    return [
+        (
+            None
+            if item is None
+            else np.ndarray(item[1], dtype=np.uint8, buffer=shm.buf, offset=item[0])
+        )
+        for item in layout
+    ]
+
+
+# 클라이언트 공유 메모리 연결 (연결마다 최근 버퍼 하나만 유지)
+def _attach(attached: dict, name: str) -> SharedMemory:
+    if name not in attached:
+        # 클라이언트가 버퍼를 키우면 새 이름이 옴 → 이전 것은 닫음
+        for old in attached.values():
+            old.close()
+        attached.clear()
+        attached[name] = SharedMemory(name=name)
+        # 생성한 쪽(클라이언트)이 정리하므로 서버 종료 시 unlink되지 않게 함
+        resource_tracker.unregister(attached[name]._name, "shared_memory")
+    return attached[name]
+
+
+# 요청 하나 처리 (공유 메모리 뷰는 이 함수 안에서만 살아 있음)
+def _dispatch(engine: FaceEngine, request: dict, attached: dict) -> dict:
+    op = request["op"]
+
+    if op == "get_faces_batch":
+        images = _image_views(_attach(attached, request["shm"]), request["images"])
+        results = engine.get_faces_batch(
+            images, request["profile"], request.get("quality")
+        )
+        return {"ok": True, "faces": [[dict(f) for f in faces] for faces in results]}
+
+    if op == "embed_crops":
+        crops = _image_views(_attach(attached, request["shm"]), request["images"])
+        return {"ok": True, "embeddings": engine.embed_crops(crops)}
+
+    if op == "get_faces_encoded_batch":
+        # 압축된 원본 바이트를 받아 서버에서 2단계 디코딩
+        results = engine.get_faces_encoded_batch(
+            request["images"], request["profile"], request.get("quality")
+        )
+        return {"ok": True, "faces": [[dict(f) for f in faces] for faces in results]}
+
+    if op == "warmup":
+        engine.warmup()
+        return {"ok": True, "status": engine.status}
+
+    if op == "status":
+        return {"ok": True, "status": engine.status}
+
+    return {"ok": False, "error": f"알 수 없는 요청: {op}"}
+
+
+# 연결 하나(= API 워커의 스레드 하나)를 처리
+def _handle_connection(engine: FaceEngine, conn):
+    attached = {}  # 이 연결이 사용하는 공유 메모리 (이름 → SharedMemory)
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+
+            try:
+                response = _dispatch(engine, request, attached)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            conn.send(response)
+    finally:
+        for shm in attached.values():
+            shm.close()
+        conn.close()
+
+
+def serve(socket_path: str = INFERENCE_SERVER_SOCKET):
+    engine = FaceEngine()
+    engine.warmup()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # 같은 사용자의 API 워커만 접속하도록 소켓 파일을 처음부터 0600으로 생성
+    # (bind 후 chmod하면 그 사이에 다른 사용자가 접속할 수 있으므로 bind 동안만 umask 변경)
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(socket_path, family="AF_UNIX")
+    finally:
+        os.umask(old_umask)
+    print(f"✅ 얼굴 추론 서버 대기 중: {socket_path}")
+
+    try:
+        while True:
+            conn = listener.accept()
+            threading.Thread(
+                target=_handle_connection, args=(engine, conn), daemon=True
+            ).start()
+    finally:
+        listener.close()
+
+
+# API 워커 쪽 FaceEngine: 추론은 추론 서버 프로세스에 맡김
+class RemoteFaceEngine(FaceEngine):
+    def __init__(self, socket_path: str):
+        super().__init__()
+        self.socket_path = socket_path
+        self._local = threading.local()  # 스레드별 연결 + 공유 메모리 버퍼
+        self._buffers = set()  # 이 프로세스가 만든 공유 메모리 (종료 시 해제)
+        self._buffers_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _request(self, message: dict) -> dict:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.socket_path, family="AF_UNIX")
+        try:
+            conn.send(message)
+            response = conn.recv()
+        except (EOFError, OSError):
+            # 추론 서버 재시작 등으로 연결이 끊기면 다음 요청에서 다시 연결
+            self._local.conn = None
+            raise
+        if not response["ok"]:
+            raise RuntimeError(f"추론 서버 오류: {response['error']}")
+        return response
+
+    # 스레드 전용 공유 메모리 버퍼 (부족할 때만 새로 만들고 이전 버퍼는 해제)
+    def _buffer(self, size: int) -> SharedMemory:
+        shm = getattr(self._local, "shm", None)
+        if shm is None or shm.size < size:
+            if shm is not None:
+                self._release(shm)
+            shm = self._local.shm = SharedMemory(create=True, size=max(size, 1))
+            with self._buffers_lock:
+                self._buffers.add(shm)
+        return shm
+
+    def _release(self, shm: SharedMemory):
+        with self._buffers_lock:
+            self._buffers.discard(shm)
+        shm.close()
+        shm.unlink()
+
+    # 만들어 둔 공유 메모리 버퍼 모두 해제
+    def close(self):
+        with self._buffers_lock:
+            buffers = list(self._buffers)
+        for shm in buffers:
+            self._release(shm)
+
+    # 모델은 추론 서버에만 있음 → 모델에 직접 접근하는 상속 경로는 명확한 오류로 막음
+    @property
+    def model(self):
+        raise RuntimeError(
+            "RemoteFaceEngine에는 로컬 모델이 없습니다. 추론 서버 요청(op)으로 처리해야 합니다."
+        )
+
+    def load(self):
+        self._request({"op": "status"})
+        self.status["loaded"] = True
+
+    def warmup(self) -> bool:
+        try:
+            start = time.perf_counter()
+            status = self._request({"op": "warmup"})["status"]
+            self.status.update(status, loaded=True)
+            self.status["warmup_seconds"] = round(time.perf_counter() - start, 3)
+            return status["warm"]
+        except Exception as e:
+            self.status["error"] = str(e)
+            print(f"⚠️ 추론 서버 연결 실패: {e}")
+            return False
+
+    # 이미지들을 공유 메모리에 이어서 복사 → (버퍼, 이미지별 (offset, shape))
+    def _share_images(self, images: List[Optional[np.ndarray]]):
+        sizes = [0 if image is None else image.nbytes for image in images]
+        shm = self._buffer(sum(sizes))
+
+        layout, offset = [], 0
+        for image, size in zip(images, sizes):
+            if image is None:
+                layout.append(None)
+                continue
+            view = np.ndarray(
+                image.shape, dtype=np.uint8, buffer=shm.buf, offset=offset
+            )
+            view[...] = image
+            layout.append((offset, image.shape))
+            offset += size
+        return shm, layout
+
+    # 정렬은 이 프로세스에서 (모델 없이 kps만 필요), 임베딩만 추론 서버에서
+    def align_crops(self, image_rgb: np.ndarray, faces: List[Face]) -> list:
+        from insightface.utils import face_align
+
+        return [
+            face_align.norm_crop(image_rgb, landmark=np.asarray(face.kps))
+            for face in faces
+        ]
+
+    def embed_crops(self, crops: list) -> np.ndarray:
+        shm, layout = self._share_images(crops)
+        with self.timings.measure("remote"):
+            response = self._request(
+                {"op": "embed_crops", "shm": shm.name, "images": layout}
+            )
+        return response["embeddings"]
+
+    def get_faces(
+        self,
+        image: np.ndarray,
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ):
+        return self.get_faces_batch([image], profile, quality)[0]
+
+    def get_faces_batch(
+        self,
+        images: List[np.ndarray],
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ) -> List[list]:
+        shm, layout = self._share_images(images)
+        with self.timings.measure("remote"):
+            response = self._request(
+                {
+                    "op": "get_faces_batch",
+                    "shm": shm.name,
+                    "images": layout,
+                    "profile": profile or self.default_profile,
+                    "quality": quality,
+                }
+            )
+        self.status["warm"] = True
+        return [[Face(f) for f in faces] for faces in response["faces"]]
+
+    # 디코딩 전 바이트는 픽셀보다 훨씬 작으므로 공유 메모리 없이 그대로 전송
+    def get_faces_encoded_batch(
+        self,
+        images_bytes: List[bytes],
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ) -> List[list]:
+        with self.timings.measure("remote"):
+            response = self._request(
+                {
+                    "op": "get_faces_encoded_batch",
+                    "images": list(images_bytes),
+                    "profile": profile or self.default_profile,
+                    "quality": quality,
+                }
+            )
+        self.status["warm"] = True
+        return [[Face(f) for f in faces] for faces in response["faces"]]
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,24 +1,385 @@
-import insightface
+import os
+import threading
+import time
+from typing import Iterable, List, Optional
+
 import numpy as np
 import cv2
 
+from src.utils.timing import StageTimings
+from src.utils.image_utils import decode_image, decode_image_reduced
+from src.services.user.face_quality import QualityGate
+from src.constants import (
+    FACE_REC_BATCH_SIZE,
+    FACE_ANALYSIS_PROFILES,
+    FACE_DEFAULT_PROFILE,
+    FACE_PIPELINE_PROFILES,
+    INFERENCE_SERVER_SOCKET,
+    FACE_REC_PRECISION,
+    FACE_REC_INT8_PATH,
+    FACE_MODEL_DIR,
+    ORT_SESSION_CONFIG,
+    FACE_DET_SIZE,
+)
 
-class FaceEngine:
-    def __init__(self):
-        # InsightFace 모델 로드 (buffalo_l은 정확도 높은 모델)
-        self.model = insightface.app.FaceAnalysis(
-            name="buffalo_l", providers=["CPUExecutionProvider"]
+PROVIDERS = ("CPUExecutionProvider",)
+
+
+# InsightFace의 Face와 같은 형태의 얼굴 결과 (속성으로 접근하는 dict, 없는 키는 None)
+class Face(dict):
+    __getattr__ = dict.get
+    __setattr__ = dict.__setitem__
+
+
+# ORT_SESSION_CONFIG 형식의 설정 → onnxruntime.SessionOptions
+def make_session_options(config: dict):
+    import onnxruntime
+
+    levels = {
+        "disabled": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    modes = {
+        "sequential": onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+        "parallel": onnxruntime.ExecutionMode.ORT_PARALLEL,
+    }
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = config["intra_op_threads"]
+    options.inter_op_num_threads = config["inter_op_threads"]
+    options.execution_mode = modes[config["execution_mode"]]
+    options.graph_optimization_level = levels[config["graph_opt_level"]]
+    options.enable_cpu_mem_arena = config["mem_arena"]
+    return options
+
+
+# 모델 세션을 SessionOptions를 적용한 새 세션으로 교체
+# (insightface의 get_model은 providers만 넘기고 sess_options는 넘기지 않음)
+def apply_session_options(model, options, providers=PROVIDERS):
+    import onnxruntime
+
+    model.session = onnxruntime.InferenceSession(
+        model.model_file, sess_options=options, providers=list(providers)
+    )
+
+
+# FP32 인식 모델 경로 → INT8 양자화 모델 경로 (w600k_r50.onnx → FACE_MODEL_DIR/w600k_r50_int8.onnx)
+# buffalo_l 모델 폴더 밖에 둠 (폴더 안의 *.onnx는 FaceAnalysis가 모두 로드함)
+def int8_model_path(fp32_path: str) -> str:
+    if FACE_REC_INT8_PATH:
+        return FACE_REC_INT8_PATH
+    name = os.path.basename(fp32_path).replace(".onnx", "_int8.onnx")
+    return os.path.join(FACE_MODEL_DIR, name)
+
+
+# INT8 인식 모델 로드 (전처리 값은 FP32 모델과 동일하게 맞춤)
+def load_int8_recognition(fp32_model, providers=PROVIDERS, options=None):
+    from insightface.model_zoo import get_model
+
+    path = int8_model_path(fp32_model.model_file)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"INT8 인식 모델이 없습니다: {path} "
+            "(python -m scripts.quantize_recognition 으로 생성)"
         )
-        self.model.prepare(ctx_id=0)
+    rec_model = get_model(path, providers=list(providers))
+    if options is not None:
+        apply_session_options(rec_model, options, providers)
+    rec_model.prepare(ctx_id=0)
+    rec_model.input_mean = fp32_model.input_mean
+    rec_model.input_std = fp32_model.input_std
+    return rec_model
+
+
+class FaceEngine:
+    def __init__(
+        self,
+        used_profiles: Optional[Iterable[str]] = None,
+        rec_precision: str = FACE_REC_PRECISION,
+        session_config: Optional[dict] = None,
+        det_size: int = FACE_DET_SIZE,
+    ):
+        self.default_profile = FACE_DEFAULT_PROFILE
+        self.rec_precision = rec_precision  # 인식 모델 정밀도 ("fp32" / "int8")
+        self.session_config = session_config or ORT_SESSION_CONFIG
+        self.det_size = det_size
+        self.timings = StageTimings()  # 단계별 추론 시간
+
+        if used_profiles is None:
+            used_profiles = {FACE_DEFAULT_PROFILE, *FACE_PIPELINE_PROFILES.values()}
+        self.used_profiles = set(used_profiles)
+
+        # 모델은 처음 사용할 때(또는 lifespan 워밍업 때) 로드
+        self._model = None
+        self._load_lock = threading.Lock()
+        self.status = {
+            "loaded": False,
+            "warm": False,
+            "load_seconds": None,
+            "warmup_seconds": None,
+            "rec_precision": rec_precision,
+            "session_config": self.session_config,
+            "det_size": det_size,
+            "error": None,
+        }
+
+    @property
+    def model(self):
+        if self._model is None:
+            self.load()
+        return self._model
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status["loaded"] and self.status["warm"]
+
+    # 추론 결과를 바꾸는 설정의 조합 (임베딩 캐시 키에 사용)
+    def model_version(self, profile: Optional[str] = None) -> str:
+        profile = profile or self.default_profile
+        return f"buffalo_l:{profile}:{self.rec_precision}:{self.det_size}"
+
+    # InsightFace 모델 로드 (여러 요청이 동시에 들어와도 한 번만 로드)
+    def load(self):
+        with self._load_lock:
+            if self._model is not None:
+                return
+
+            import insightface  # 무거운 import도 실제 로드 시점까지 미룸
+
+            start = time.perf_counter()
+
+            # 사용하는 프로필들의 모듈만 로드 (하나라도 전체 프로필이면 전부 로드)
+            modules = [FACE_ANALYSIS_PROFILES[p] for p in self.used_profiles]
+            allowed_modules = (
+                None if None in modules else sorted({m for ms in modules for m in ms})
+            )
+
+            # InsightFace 모델 로드 (buffalo_l은 정확도 높은 모델)
+            model = insightface.app.FaceAnalysis(
+                name="buffalo_l",
+                providers=list(PROVIDERS),
+                allowed_modules=allowed_modules,
+            )
+
+            # 스레드 수/그래프 최적화/메모리 arena 설정을 모든 모델 세션에 적용
+            options = make_session_options(self.session_config)
+            for sub_model in model.models.values():
+                apply_session_options(sub_model, options)
+
+            # CPU 배포용: 인식 모델만 INT8 동적 양자화 버전으로 교체
+            if self.rec_precision == "int8":
+                model.models["recognition"] = load_int8_recognition(
+                    model.models["recognition"], options=options
+                )
+
+            model.prepare(ctx_id=0, det_size=(self.det_size, self.det_size))
+
+            self._model = model
+            self.status["loaded"] = True
+            self.status["load_seconds"] = round(time.perf_counter() - start, 3)
+
+    # 더미 이미지로 검출·인식 모델을 한 번씩 실행해 첫 요청 지연 제거
+    def warmup(self) -> bool:
+        try:
+            self.load()
+            start = time.perf_counter()
+            self.get_faces(np.zeros((640, 640, 3), dtype=np.uint8))
+            rec_model = self.model.models["recognition"]
+            rec_model.get_feat([np.zeros((112, 112, 3), dtype=np.uint8)])
+
+            self.timings.reset()  # 워밍업 시간은 통계에서 제외
+            self.status["warm"] = True
+            self.status["warmup_seconds"] = round(time.perf_counter() - start, 3)
+            print(f"✅ 얼굴 엔진 준비 완료: {self.status}")
+            return True
+        except Exception as e:
+            self.status["error"] = str(e)
+            print(f"⚠️ 얼굴 엔진 워밍업 실패: {e}")
+            return False
+
+    # 프로필에서 검출·인식 외에 추가로 실행할 모델들 (taskname, model)
+    def _extra_models(self, profile: Optional[str]):
+        modules = FACE_ANALYSIS_PROFILES[profile or self.default_profile]
+        return [
+            (taskname, model)
+            for taskname, model in self.model.models.items()
+            if taskname not in ("detection", "recognition")
+            and (modules is None or taskname in modules)
+        ]
 
     # 얼굴 전체 정보 (bbox + landmarks + embedding) 반환
-    def get_faces(self, image: np.ndarray):
-        if image is None:
-            return []
-        # OpenCV의 BGR 이미지를 RGB로 변환 (InsightFace는 RGB 이미지 사용)
-        if image.shape[2] == 3:
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        return self.model.get(image)
+    # profile: 실행할 분석 프로필 (기본: FACE_DEFAULT_PROFILE)
+    def get_faces(
+        self,
+        image: np.ndarray,
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ):
+        return self.get_faces_batch([image], profile=profile, quality=quality)[0]
+
+    # 검출용 이미지: 검출 입력 크기(det_size)로 축소한 뒤 RGB 변환
+    # (검출 모델은 어차피 det_size로 줄여서 보므로 원본 전체를 변환할 필요 없음)
+    # 반환: (RGB 검출 이미지, 원본 좌표 배율 [sx, sy])
+    def _detection_image(self, image_bgr: np.ndarray):
+        h, w = image_bgr.shape[:2]
+        ratio = self.det_size / max(h, w)
+        if ratio < 1:
+            size = (max(1, round(w * ratio)), max(1, round(h * ratio)))
+            image_bgr = cv2.resize(image_bgr, size)
+        scale = np.array([w / image_bgr.shape[1], h / image_bgr.shape[0]])
+        return cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB), scale
+
+    # 얼굴 검출만 수행 (RGB 이미지 → bbox/kps/det_score만 채운 Face 목록)
+    # scale: 검출 이미지 → 원본 좌표 배율 (축소 이미지로 검출했을 때)
+    def detect_faces(self, image_rgb: np.ndarray, scale=None) -> List[Face]:
+        with self.timings.measure("detection"):
+            bboxes, kpss = self.model.det_model.detect(
+                image_rgb, max_num=0, metric="default"
+            )
+        if scale is not None:
+            bboxes[:, 0:4] *= np.tile(scale, 2)
+            kpss = kpss * scale
+        return [
+            Face(bbox=bboxes[i, 0:4], kps=kpss[i], det_score=bboxes[i, 4])
+            for i in range(bboxes.shape[0])
+        ]
+
+    # kps 기준으로 인식 모델 입력 크기(112×112) 정렬 크롭
+    def align_crops(self, image_rgb: np.ndarray, faces: List[Face]) -> list:
+        from insightface.utils import face_align
+
+        size = self.model.models["recognition"].input_size[0]
+        return [
+            face_align.norm_crop(image_rgb, landmark=face.kps, image_size=size)
+            for face in faces
+        ]
+
+    # BGR 원본에서 바로 정렬 크롭 후 크롭만 RGB로 변환 (전체 이미지 색 변환 생략)
+    def align_crops_bgr(self, image_bgr: np.ndarray, faces: List[Face]) -> list:
+        return [
+            cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+            for crop in self.align_crops(image_bgr, faces)
+        ]
+
+    # 정렬 크롭들을 FACE_REC_BATCH_SIZE개씩 배치 추론 → (N, 512) 임베딩
+    def embed_crops(self, crops: list) -> np.ndarray:
+        rec_model = self.model.models["recognition"]
+        with self.timings.measure("recognition", count=len(crops)):
+            return np.concatenate(
+                [
+                    rec_model.get_feat(crops[i : i + FACE_REC_BATCH_SIZE])
+                    for i in range(0, len(crops), FACE_REC_BATCH_SIZE)
+                ]
+            )
+
+    # 품질 검사(크롭 전) → 통과한 얼굴 목록, 탈락한 얼굴은 face.rejected에 사유 기록
+    def _gate_faces(self, faces: List[Face], gate: QualityGate) -> List[Face]:
+        passed = []
+        for face in faces:
+            face.rejected = gate.check_face(face)
+            if face.rejected is None:
+                passed.append(face)
+        return passed
+
+    # 크롭 품질 검사(선명도)까지 통과한 얼굴과 크롭만 임베딩 대상에 추가
+    def _queue_crops(self, faces, crops, gate, queue_faces, queue_crops):
+        for face, crop in zip(faces, crops):
+            face.rejected = gate.check_crop(crop)
+            if face.rejected is None:
+                queue_faces.append(face)
+                queue_crops.append(crop)
+
+    # 모아 둔 크롭들을 한 번에 임베딩해 해당 얼굴에 채움
+    def _attach_embeddings(self, faces: List[Face], crops: list):
+        if crops:
+            for face, embedding in zip(faces, self.embed_crops(crops)):
+                face.embedding = embedding
+
+        self.status["warm"] = True  # lazy 로드 시에도 첫 추론 이후에는 준비 완료
+
+    # 여러 이미지의 얼굴을 검출한 뒤, 모든 얼굴 크롭을 한 번의 배치 추론으로 임베딩
+    # (이미지별 Face 목록 반환, 프로필의 추가 모델은 얼굴마다 실행)
+    # 검출은 축소 이미지로, 인식 크롭은 원본 해상도에서 추출 (bbox/kps는 원본 좌표)
+    # quality: 품질 기준 (FACE_QUALITY_GATES 값) — 탈락한 얼굴은 임베딩 없이 rejected 사유만 가짐
+    def get_faces_batch(
+        self,
+        images: List[np.ndarray],
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ) -> List[list]:
+        extra_models = self._extra_models(profile)
+        gate = QualityGate(quality)
+
+        results = []
+        queue_faces, queue_crops = [], []
+        for image in images:
+            if image is None:
+                results.append([])
+                continue
+
+            det_image, scale = self._detection_image(image)
+            faces = self.detect_faces(det_image, scale)
+            passed = self._gate_faces(faces, gate)
+            crops = self.align_crops_bgr(image, passed)
+            self._queue_crops(passed, crops, gate, queue_faces, queue_crops)
+
+            if extra_models and passed:
+                # 추가 모델(성별·나이, 106 랜드마크 등)은 원본 RGB 이미지 기준
+                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                for face in passed:
+                    for taskname, model in extra_models:
+                        with self.timings.measure(taskname):
+                            model.get(image_rgb, face)
+            results.append(faces)
+
+        self._attach_embeddings(queue_faces, queue_crops)
+        return results
+
+    # 업로드 바이트들 → 이미지별 Face 목록 (2단계 디코딩)
+    # 1) JPEG은 검출에 충분한 크기로만 축소 디코딩해서 검출
+    # 2) 품질 검사를 통과한 얼굴이 있으면 원본 해상도로 디코딩해 크롭
+    #    (인식 크롭은 등록 갤러리와 같은 원본 해상도 기준, 얼굴이 없는 이미지만 원본 디코딩 생략)
+    # bbox/kps는 항상 원본 좌표로 반환
+    def get_faces_encoded_batch(
+        self,
+        images_bytes: List[bytes],
+        profile: Optional[str] = None,
+        quality: Optional[dict] = None,
+    ) -> List[list]:
+        if self._extra_models(profile):
+            # 추가 모델은 원본 RGB 이미지가 필요 → 전체 디코딩 경로 사용
+            with self.timings.measure("decode", count=len(images_bytes)):
+                images = [decode_image(b) for b in images_bytes]
+            return self.get_faces_batch(images, profile=profile, quality=quality)
+
+        gate = QualityGate(quality)
+        results = []
+        queue_faces, queue_crops = [], []
+        for image_bytes in images_bytes:
+            with self.timings.measure("decode"):
+                image, factor = decode_image_reduced(image_bytes, self.det_size)
+            if image is None:
+                results.append([])
+                continue
+
+            det_image, scale = self._detection_image(image)
+            faces = self.detect_faces(det_image, scale)
+            for face in faces:
+                face.bbox = face.bbox * factor
+                face.kps = face.kps * factor
+            passed = self._gate_faces(faces, gate)
+
+            if factor > 1 and passed:
+                with self.timings.measure("decode_full"):
+                    image = decode_image(image_bytes)
+            crops = self.align_crops_bgr(image, passed)
+            self._queue_crops(passed, crops, gate, queue_faces, queue_crops)
+            results.append(faces)
+
+        self._attach_embeddings(queue_faces, queue_crops)
+        return results
 
     #  얼굴 벡터 추출
     def get_embedding(self, face) -> np.ndarray:
@@ -42,5 +403,10 @@ class FaceEngine:
         return image[y1:y2, x1:x2]
 
 
-# 전역 인스턴스
-face_engine = FaceEngine()
+# 전역 인스턴스 (INFERENCE_SERVER_SOCKET이 설정되면 별도 추론 서버 프로세스 사용)
+if INFERENCE_SERVER_SOCKET:
+    from src.services.user.inference_server import RemoteFaceEngine
+
+    face_engine = RemoteFaceEngine(INFERENCE_SERVER_SOCKET)
+else:
+    face_engine = FaceEngine()
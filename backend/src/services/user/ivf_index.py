@@ -0,0 +1,78 @@
+import numpy as np
+from sklearn.cluster import KMeans
+
+
+# 사용자 centroid들로 coarse quantizer(IVF 리스트 중심) 학습
+def train_coarse_quantizer(points: np.ndarray, nlist: int) -> np.ndarray:
+    nlist = max(1, min(nlist, len(points)))
+    kmeans = KMeans(n_clusters=nlist, n_init=1, random_state=42)
+    kmeans.fit(points)
+
+    centers = kmeans.cluster_centers_.astype(np.float32)
+    norms = np.linalg.norm(centers, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return centers / norms
+
+
+# 리스트 개수 자동 결정 (포인트 수의 제곱근 수준)
+def default_nlist(n_points: int) -> int:
+    return max(1, int(np.sqrt(n_points)))
+
+
+# Inverted File 인덱스: coarse 리스트를 nprobe개만 탐색 후 raw 벡터로 정확히 재정렬
+class IVFIndex:
+    def __init__(self, coarse_centers: np.ndarray, matrix: np.ndarray):
+        self.coarse_centers = coarse_centers
+
+        # 갤러리 각 행을 가장 가까운 coarse 리스트에 배정
+        row_lists = np.argmax(matrix @ coarse_centers.T, axis=1)
+        list_rows = np.argsort(row_lists, kind="stable")
+        counts = np.bincount(row_lists, minlength=len(coarse_centers))
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # 리스트 순서로 재배치한 행렬 (각 리스트가 연속된 슬라이스가 됨)
+        self.list_matrix = matrix[list_rows]
+        self.list_rows = list_rows
+
+    @property
+    def nlist(self) -> int:
+        return len(self.coarse_centers)
+
+    # 쿼리 얼굴별로 탐색할 리스트 표시 (F, nlist) bool
+    def probe(self, queries: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = max(1, min(nprobe, self.nlist))
+        coarse_sims = queries @ self.coarse_centers.T
+        top_lists = np.argpartition(-coarse_sims, nprobe - 1, axis=1)[:, :nprobe]
+
+        probed = np.zeros((len(queries), self.nlist), dtype=bool)
+        probed[np.arange(len(queries))[:, None], top_lists] = True
+        return probed
+
+    # 얼굴(F) × 사용자(U) 최대 유사도 (탐색되지 않은 사용자는 -inf)
+    def search(
+        self,
+        queries: np.ndarray,
+        row_users: np.ndarray,
+        n_users: int,
+        nprobe: int,
+    ) -> np.ndarray:
+        scores = np.full((len(queries), n_users), -np.inf, dtype=np.float32)
+        probed = self.probe(queries, nprobe)
+
+        # 리스트 단위로, 해당 리스트를 탐색하는 얼굴들만 raw 벡터와 정확히 비교
+        for l in np.flatnonzero(probed.any(axis=0)):
+            begin, end = self.list_offsets[l], self.list_offsets[l + 1]
+            if begin == end:
+                continue
+            faces = np.flatnonzero(probed[:, l])
+            sims = queries[faces] @ self.list_matrix[begin:end].T
+
+            # 리스트 안에서도 행은 사용자별로 연속 → 사용자 구간별 최대값
+            users = row_users[self.list_rows[begin:end]]
+            starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+            block = np.ix_(faces, users[starts])
+            scores[block] = np.maximum(
+                scores[block], np.maximum.reduceat(sims, starts, axis=1)
+            )
+
+        return scores
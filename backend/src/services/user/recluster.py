@@ -0,0 +1,159 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from src.services.user.clustering import update_user_clusters
+from src.services.user.gallery import face_gallery
+from src.services.user.storage import face_db, face_db_lock, save_user_clusters
+from src.constants import CLUSTER_DEBOUNCE_SECONDS
+
+
+# 사용자 클러스터링 백그라운드 스케줄러
+# - 등록 API는 사용자를 dirty로 표시만 하고 바로 응답 (sklearn을 기다리지 않음)
+# - 워커 스레드가 debounce 시간 동안 모인 dirty 사용자를 한 번씩만 다시 클러스터링
+#   (연속 등록이 여러 번 와도 한 번으로 합쳐짐)
+# - 클러스터링은 raw 배열을 가리키는 임시 dict에서 계산하고, 끝나면 face_db에 한 번에 교체
+#   (그 사이 raw가 바뀌었으면 결과를 버리고 다시 dirty로 남김)
+class ReclusterScheduler:
+    def __init__(self, debounce: float = CLUSTER_DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self._cond = threading.Condition()
+        self._dirty = set()
+        self._status: Dict[int, dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    # 사용자를 다시 클러스터링 대상으로 표시 → 현재 상태
+    def mark_dirty(self, user_id: int) -> dict:
+        with self._cond:
+            status = self._status.setdefault(user_id, {"runs": 0, "coalesced": 0})
+            if user_id in self._dirty:
+                status["coalesced"] += 1  # 아직 처리 전인 요청과 합쳐짐
+            self._dirty.add(user_id)
+            status["state"] = "pending"
+            status["requested_at"] = time.time()
+            self._start_worker()
+            self._cond.notify()
+            return dict(status)
+
+    # 클러스터 labels가 raw 벡터 수와 맞지 않는 사용자를 다시 예약 (서버 시작 시)
+    # 백그라운드 클러스터링 전에 서버가 종료되면 저장소에는 이전 클러스터(또는 없음)가 남아 있음
+    # → 예약한 사용자 수
+    def requeue_stale(self, face_db: dict, min_vectors: int = 5) -> int:
+        stale = [
+            user_id
+            for user_id, user_data in face_db.items()
+            if len(user_data.get("raw", [])) >= min_vectors
+            and len((user_data.get("clusters") or {}).get("labels", []))
+            != len(user_data["raw"])
+        ]
+        for user_id in stale:
+            self.mark_dirty(user_id)
+        return len(stale)
+
+    # 워커 스레드는 처음 dirty 표시가 들어올 때 시작
+    def _start_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="recluster", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopping:
+                    self._cond.wait()
+                if not self._dirty:
+                    return
+            # 연속 등록을 모으기 위해 잠시 기다린 뒤 한꺼번에 꺼냄 (종료 중이면 바로 처리)
+            if not self._stopping:
+                time.sleep(self.debounce)
+            with self._cond:
+                batch, self._dirty = self._dirty, set()
+
+            for user_id in batch:
+                self._recluster(user_id)
+
+    def _recluster(self, user_id: int):
+        self._set_status(user_id, state="running")
+        start = time.perf_counter()
+        try:
+            with face_db_lock:
+                user_data = face_db.get(user_id)
+                if user_data is None:
+                    self._set_status(user_id, state="removed")
+                    return
+                raw = user_data["raw"]
+                clusters = user_data.get("clusters")
+
+            # face_db를 잠그지 않은 채로 계산 (출석체크는 이전 클러스터로 계속 동작)
+            work_db = {user_id: {"raw": raw}}
+            if clusters:
+                work_db[user_id]["clusters"] = clusters
+            message = update_user_clusters(work_db, user_id)
+            new_clusters = work_db[user_id].get("clusters")
+
+            with face_db_lock:
+                user_data = face_db.get(user_id)
+                if user_data is None or user_data["raw"] is not raw:
+                    # 계산 중에 벡터가 추가/압축됨 → 새로 표시된 dirty 요청이 다시 처리
+                    self._set_status(user_id, state="stale")
+                    return
+                if new_clusters is not clusters:
+                    user_data["clusters"] = new_clusters
+
+            face_gallery.update_user(user_id, user_data)
+            if new_clusters is not clusters:
+                save_user_clusters(user_id)
+
+            self._set_status(
+                user_id,
+                state="done",
+                message=message,
+                seconds=round(time.perf_counter() - start, 3),
+                error=None,
+            )
+        except Exception as e:
+            print(f"⚠️ 사용자 {user_id} 클러스터링 실패: {e}")
+            self._set_status(user_id, state="error", error=str(e))
+
+    def _set_status(self, user_id: int, **fields):
+        with self._cond:
+            status = self._status.setdefault(user_id, {"runs": 0, "coalesced": 0})
+            # 처리 중에 다시 dirty로 표시되었으면 pending 상태를 유지
+            if user_id in self._dirty and fields.get("state") != "running":
+                fields["state"] = "pending"
+            if fields.get("state") == "running":
+                status["runs"] += 1
+            status.update(fields, updated_at=time.time())
+
+    # 사용자별 클러스터링 상태 (한 번도 요청되지 않았으면 None)
+    def status(self, user_id: int) -> Optional[dict]:
+        with self._cond:
+            status = self._status.get(user_id)
+            return dict(status) if status else None
+
+    def stats(self) -> dict:
+        with self._cond:
+            states = [s["state"] for s in self._status.values()]
+            return {
+                "pending": len(self._dirty),
+                "running": states.count("running"),
+                "users": len(self._status),
+                "errors": states.count("error"),
+            }
+
+    # 남은 dirty 사용자를 처리하고 워커 종료
+    def shutdown(self, timeout: float = 30.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+# 전역 인스턴스
+recluster_scheduler = ReclusterScheduler()
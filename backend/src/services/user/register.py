@@ -1,38 +1,407 @@
+import multiprocessing
 import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 
 import cv2
 import numpy as np
-import uuid
-import face_recognition
 import random
 
-
-# 업로드 영상에서 프레임 추출
-def extract_frames_from_video(video_bytes, interval=10):
-    np_array = np.frombuffer(video_bytes, np.uint8)
-    temp_video_path = f"temp_{uuid.uuid4().hex}.mp4"
-    with open(temp_video_path, "wb") as f:
-        f.write(np_array)
-
-    cap = cv2.VideoCapture(temp_video_path)
-    frames = []
-    frame_count = 0
-
-    while True:
-        success, frame = cap.read()
-        if not success:
-            break
-        if frame_count % interval == 0:
-            frames.append(frame)
-        frame_count += 1
-
-    cap.release()
-    os.remove(temp_video_path)
-    return frames
-
-
-# 데이터 증강 로직
-def augment_image(image: np.ndarray, use_flip=False) -> list:
+from src.utils.timing import StageTimings
+from src.utils.video_utils import iter_video_frames
+from src.services.user.insightface_wrapper import Face, face_engine
+from src.services.user.face_quality import QualityGate, quality_stats
+from src.services.user.face_tracker import FaceTracker
+from src.services.user.frame_novelty import FrameNoveltyFilter
+from src.constants import (
+    FRAME_IMAGE_DIR,
+    AUG_IMAGE_DIR,
+    FACE_PIPELINE_PROFILES,
+    FACE_QUALITY_GATES,
+    VIDEO_PIPELINE_QUEUE,
+    AUGMENT_WORKERS,
+    REGISTER_AUGMENT_MODE,
+    VIDEO_DEDUP,
+    VIDEO_SAMPLE_FPS,
+    VIDEO_TRACKING,
+    VIDEO_TRACK_SAMPLE_FPS,
+)
+
+# 파이프라인 종료/실패 신호
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+# 멈춘 소비자 때문에 생산자 스레드가 영원히 막히지 않도록 stop을 확인하며 put
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+# 생성기를 별도 스레드에서 돌려 크기 제한 대기열로 넘김 (앞 단계와 다음 단계를 겹쳐 실행)
+def _prefetch(iterable, maxsize: int, timings: StageTimings, stage: str):
+    q = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def produce():
+        it = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                timings.add(stage, time.perf_counter() - start)
+                if not _put(q, item, stop):
+                    break
+        except Exception as e:
+            _put(q, _Failure(e), stop)
+        finally:
+            if hasattr(it, "close"):
+                it.close()  # 영상 디코더 해제
+            _put(q, _DONE, stop)
+
+    threading.Thread(target=produce, name=f"{stage}-producer", daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+
+
+# 프레임/증강 이미지를 별도 스레드에서 디스크에 기록 (크기 제한 대기열, 프레임 maxsize개까지)
+# 저장에 실패하면 스레드는 멈추고, 오류는 다음 write/close에서 호출한 쪽으로 다시 발생
+# (멈춘 스레드 때문에 대기열 put이 영원히 막히지 않음)
+class _ImageWriter:
+    def __init__(self, maxsize: int, timings: StageTimings):
+        self._queue = queue.Queue(maxsize)
+        self._timings = timings
+        self._failed = threading.Event()
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer")
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            groups = self._queue.get()
+            if groups is _DONE:
+                return
+            try:
+                for path, images in groups:
+                    with self._timings.measure("persist", count=len(images)):
+                        for i, image in enumerate(images):
+                            if not cv2.imwrite(path.format(i), image):
+                                raise OSError(f"이미지 저장 실패: {path.format(i)}")
+            except Exception as e:
+                self._error = e
+                self._failed.set()
+                return
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    # 프레임 하나의 이미지 묶음들 (경로, 이미지들)을 대기열 항목 하나로 기록
+    # 경로는 이미지 번호가 들어갈 {} 자리를 포함한 형식 문자열 (한 장이면 생략 가능)
+    def write(self, *groups):
+        self._raise_error()
+        if not _put(self._queue, groups, self._failed):
+            self._raise_error()
+
+    def close(self):
+        _put(self._queue, _DONE, self._failed)
+        self._thread.join()
+        self._raise_error()
+
+
+# 데이터 증강용 프로세스 풀 (첫 영상 등록 때 생성)
+# 증강(랜드마크 검출 포함)은 CPU를 오래 쓰는 순수 파이썬/OpenCV 작업이라 GIL을 피해 프로세스로 분리
+# ONNX 세션 스레드가 도는 서버 프로세스를 fork하지 않도록 spawn으로 생성
+class AugmentPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    # (key, 이미지, 얼굴 랜드마크)들을 순서대로 증강 → (key, 증강 이미지들)
+    # 동시에 증강 중인 프레임은 workers × 2개까지만 (메모리 상한)
+    def map(self, items, timings: StageTimings):
+        executor = self._get_executor()
+        if executor is None:
+            for key, image, landmarks in items:
+                with timings.measure("augment"):
+                    augmented = augment_image(image, landmarks)
+                yield key, augmented
+            return
+
+        pending = deque()
+        try:
+            for key, image, landmarks in items:
+                future = executor.submit(augment_image, image, landmarks)
+                pending.append((key, future))
+                if len(pending) >= self.workers * 2:
+                    yield self._result(pending.popleft(), timings)
+            while pending:
+                yield self._result(pending.popleft(), timings)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _result(item, timings: StageTimings):
+        key, future = item
+        # 추론 스레드가 증강 결과를 기다린 시간 (증강 자체는 다른 프로세스에서 겹쳐 실행)
+        with timings.measure("augment_wait"):
+            return key, future.result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# 전역 인스턴스
+augment_pool = AugmentPool(AUGMENT_WORKERS)
+
+
+# 원본 프레임 얼굴 감지·인코딩 → (프레임, 얼굴 목록)
+# novelty가 있으면 이미 처리한 프레임과 거의 같은 프레임은 검출 전(dHash)/후(임베딩)에 건너뜀
+# tracker가 있으면 검출 사이 프레임은 추적한 kps로 바로 정렬·인코딩 (추적 실패 시 검출)
+def _detect_frames(
+    frames,
+    timings: StageTimings,
+    profile,
+    quality,
+    novelty: Optional[FrameNoveltyFilter] = None,
+    tracker: Optional[FaceTracker] = None,
+):
+    gate = QualityGate(quality)
+    for _, frame in frames:
+        frame_hash = None
+        if novelty is not None:
+            with timings.measure("dedup"):
+                frame_hash = novelty.check_frame(frame)
+            if frame_hash is None:
+                continue
+
+        face = None
+        if tracker is not None:
+            with timings.measure("track"):
+                face = tracker.track(frame)
+
+        if face is not None:
+            with timings.measure("embed_tracked"):
+                faces = [_embed_tracked(frame, face, gate)]
+        else:
+            with timings.measure("detect_frame"):
+                faces = face_engine.get_faces(frame, profile=profile, quality=quality)
+            if tracker is not None:
+                tracker.update(frame, faces)
+
+        if novelty is not None:
+            single = len(faces) == 1 and not faces[0].rejected
+            embedding = face_engine.get_embedding(faces[0]) if single else None
+            if not novelty.check_embedding(embedding):
+                continue
+            novelty.accept(frame_hash, embedding)
+        yield frame, faces
+
+
+# 추적한 얼굴 → 품질 검사 후 정렬 크롭을 바로 인식 모델로 인코딩 (검출 생략)
+def _embed_tracked(frame: np.ndarray, face: Face, gate: QualityGate) -> Face:
+    face.rejected = gate.check_face(face)
+    if face.rejected is None:
+        crops = face_engine.align_crops_bgr(frame, [face])
+        face.rejected = gate.check_crop(crops[0])
+        if face.rejected is None:
+            face.embedding = face_engine.embed_crops(crops)[0]
+    return face
+
+
+# 추론 스레드에서 프레임마다 순서대로 실행되는 단계 (다른 스레드/프로세스와 겹치지 않음)
+# decode·persist는 별도 스레드, augment_wait은 증강 프로세스와 겹치므로 제외
+_DETECT_STAGES = ("detect_frame", "track", "embed_tracked")
+_VARIANT_STAGES = ("augment", "detect_embed", "embed_augmented")
+
+
+# 중복으로 건너뛴 프레임 때문에 아낀 추론 스레드 시간 추정 (겹치지 않는 단계만 사용하는 하한값)
+# - 검출 단계 평균은 검출까지 간 프레임(처리 + 임베딩 중복) 기준, 이후 단계 평균은 처리한 프레임 기준
+# - dHash로 건너뛴 프레임은 검출 + 이후 단계, 임베딩으로 건너뛴 프레임은 이후 단계만 아낌
+def _estimate_saved_seconds(timings: dict, n_frames: int, skipped: dict) -> float:
+    if not n_frames:
+        return 0.0
+
+    def spent(stages):
+        return sum(timings[k]["total_ms"] for k in stages if k in timings) / 1000
+
+    detect = spent(_DETECT_STAGES) / (n_frames + skipped["embedding"])
+    variants = spent(_VARIANT_STAGES) / n_frames
+    saved = skipped["hash"] * (detect + variants) + skipped["embedding"] * variants
+    return round(saved, 3)
+
+
+# image 모드: 프레임 전체를 증강하고 증강 이미지마다 다시 검출·인코딩 (증강은 프로세스 풀)
+# 원본 프레임의 검출 결과(bbox, kps)로 가림 증강 위치를 잡음 (별도 랜드마크 검출 없음)
+# → (프레임, 저장할 증강 이미지들, 임베딩들, 건너뛴 이미지 수)
+def _image_variants(detected, timings: StageTimings, profile, quality):
+    items = (
+        ((frame, faces), frame, face_landmarks(faces[0]) if faces else None)
+        for frame, faces in detected
+    )
+    for (frame, frame_faces), augmented_images in augment_pool.map(items, timings):
+        # 증강 이미지 배치로 감지·인코딩 (첫 번째는 이미 처리한 원본)
+        with timings.measure("detect_embed", count=len(augmented_images) - 1):
+            batch_faces = [frame_faces] + face_engine.get_faces_batch(
+                augmented_images[1:], profile=profile, quality=quality
+            )
+        quality_stats.record("register", batch_faces)
+        embeddings = [
+            face_engine.get_embedding(faces[0])
+            for faces in batch_faces
+            if len(faces) == 1 and not faces[0].rejected
+        ]
+        yield frame, augmented_images, embeddings, len(batch_faces) - len(embeddings)
+
+
+# crop 모드: 프레임당 한 번만 검출하고, 정렬 크롭(112×112)을 증강해 한 번의 배치로 인코딩
+# (증강 이미지마다 검출·정렬을 다시 하지 않으므로 프레임당 모델 실행이 검출 1회 + 인식 배치 1회)
+def _crop_variants(detected, timings: StageTimings):
+    for frame, faces in detected:
+        quality_stats.record("register", [faces])
+        if len(faces) != 1 or faces[0].rejected:
+            yield frame, [], [], 1
+            continue
+
+        # 증강(augment_image)은 BGR 기준이므로 BGR 크롭으로 증강하고, 인식 모델 입력만 RGB로 변환
+        crop = face_engine.align_crops(frame, faces)[0]  # BGR
+        with timings.measure("augment"):
+            variants = augment_crop(crop)
+        with timings.measure("embed_augmented", count=len(variants)):
+            embeddings = list(
+                face_engine.embed_crops(
+                    [cv2.cvtColor(c, cv2.COLOR_BGR2RGB) for c in variants]
+                )
+            )
+
+        saved = [crop] + variants
+        yield frame, saved, [face_engine.get_embedding(faces[0])] + embeddings, 0
+
+
+# 영상 등록 파이프라인: 프레임 추출 → 원본 얼굴 감지 → 증강 → 얼굴 감지·인코딩 → 이미지 저장
+# - 추출은 별도 스레드, 증강은 프로세스 풀, 저장은 별도 스레드에서 겹쳐 실행
+# - 단계 사이는 크기 제한 대기열이라 영상 길이와 무관하게 메모리 사용량이 일정함
+# - augment_mode: "image"(프레임 증강 + 재검출) 또는 "crop"(정렬 크롭 증강 + 배치 인코딩)
+# - dedup: 이전 프레임과 거의 같은 프레임은 증강·인코딩·저장 생략
+# - track: VIDEO_DETECT_EVERY 프레임마다만 검출하고 그 사이는 얼굴 추적 (대신 촘촘히 샘플링)
+# (encodings_list, 얼굴이 1개가 아니라서 건너뛴 이미지 수, 처리 통계) 반환
+def embed_video_frames(
+    user_id: int,
+    video_bytes: bytes,
+    augment_mode: str = REGISTER_AUGMENT_MODE,
+    save_images: bool = True,
+    dedup: bool = VIDEO_DEDUP,
+    track: bool = VIDEO_TRACKING,
+):
+    start = time.perf_counter()
+    timings = StageTimings()
+    encodings_list = []
+    skipped = 0
+    n_frames = n_images = 0
+
+    # 저장 경로 준비
+    frame_dir = os.path.join(FRAME_IMAGE_DIR, str(user_id))
+    aug_dir = os.path.join(AUG_IMAGE_DIR, str(user_id))
+    if save_images:
+        os.makedirs(frame_dir, exist_ok=True)
+        os.makedirs(aug_dir, exist_ok=True)
+
+    profile = FACE_PIPELINE_PROFILES["register"]
+    quality = FACE_QUALITY_GATES["register"]
+    sample_fps = VIDEO_TRACK_SAMPLE_FPS if track else VIDEO_SAMPLE_FPS
+    frames = _prefetch(
+        iter_video_frames(video_bytes, sample_fps=sample_fps),
+        VIDEO_PIPELINE_QUEUE,
+        timings,
+        "decode",
+    )
+    novelty = FrameNoveltyFilter() if dedup else None
+    tracker = FaceTracker() if track else None
+    detected = _detect_frames(frames, timings, profile, quality, novelty, tracker)
+    if augment_mode == "crop":
+        variants = _crop_variants(detected, timings)
+    else:
+        variants = _image_variants(detected, timings, profile, quality)
+
+    writer = _ImageWriter(VIDEO_PIPELINE_QUEUE, timings) if save_images else None
+    try:
+        for i, (frame, images, embeddings, n_skipped) in enumerate(variants):
+            # 프레임/증강 이미지 저장 (저장 스레드)
+            if writer is not None:
+                writer.write(
+                    (os.path.join(frame_dir, f"frame_{i:03d}.jpg"), [frame]),
+                    (os.path.join(aug_dir, f"frame{i}_aug{{}}.jpg"), images),
+                )
+
+            encodings_list.extend(embeddings)
+            skipped += n_skipped
+            n_frames += 1
+            n_images += len(images)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    face_engine.timings.add(f"pipeline.register_video.{augment_mode}", elapsed)
+    summary = timings.summary()
+    skipped_frames = novelty.skipped if novelty else {"hash": 0, "embedding": 0}
+    report = {
+        "augment_mode": augment_mode,
+        "sample_fps": sample_fps,
+        "frames": n_frames,
+        "tracking": tracker.stats if tracker else None,  # 검출/추적/추적 실패 프레임 수
+        "duplicate_frames_skipped": skipped_frames,  # 중복으로 건너뛴 프레임 (검사 단계별)
+        "estimated_seconds_saved": _estimate_saved_seconds(
+            summary, n_frames, skipped_frames
+        ),
+        "images": n_images,
+        "augment_workers": augment_pool.workers if augment_mode != "crop" else 0,
+        "wall_seconds": round(elapsed, 3),
+        "timings": summary,
+    }
+    return encodings_list, skipped, report
+
+
+# 데이터 증강 로직 (landmarks: face_landmarks 결과, 없으면 가림 증강 생략)
+def augment_image(image: np.ndarray, landmarks=None, use_flip=False) -> list:
     aug_images = [image]
 
     # 밝기 증가
@@ -64,7 +433,7 @@ def augment_image(image: np.ndarray, use_flip=False) -> list:
     aug_images.append(noisy)
 
     # 얼굴 랜드마크 기반 가리기
-    res = occlusion_augment(image)
+    res = occlusion_augment(image, landmarks)
     aug_images.extend(res)
 
     return aug_images
@@ -167,17 +536,84 @@ def apply_occlusion(image: np.ndarray, landmarks: dict, region: str) -> np.ndarr
         return masked
 
 
-# 증강 적용 함수
-def occlusion_augment(image: np.ndarray, region_list=["mask", "sunglasses"]):
+# InsightFace 검출 결과 → 가림 증강에 쓰는 부위별 점 목록
+# (face_recognition.face_landmarks와 같은 키: left_eye, right_eye, nose_tip, top_lip, chin)
+# - 눈/코/입은 5점 kps, 턱선은 106점 랜드마크가 있으면 윤곽점, 없으면 bbox에 맞춘 반타원
+def face_landmarks(face, n_chin_points: int = 9) -> dict:
+    x1, y1, x2, y2 = np.asarray(face.bbox, dtype=np.float32)
+    left_eye, right_eye, nose, mouth_left, mouth_right = np.asarray(
+        face.kps, dtype=np.float32
+    )
+
+    chin = np.empty((0, 2), dtype=np.float32)
+    if face.landmark_2d_106 is not None:
+        contour = np.asarray(face.landmark_2d_106, dtype=np.float32)[:33]
+        chin = contour[contour[:, 1] >= nose[1]]  # 코 아래 윤곽 = 턱선
+        chin = chin[np.argsort(chin[:, 0])]  # 왼쪽 → 오른쪽
+    if len(chin) < 3:
+        # 코 높이에서 시작해 bbox 아래 끝을 지나는 반타원 (왼쪽 → 오른쪽)
+        theta = np.linspace(np.pi, 0, n_chin_points)
+        cx, rx = (x1 + x2) / 2, (x2 - x1) / 2
+        chin = np.stack(
+            [cx + rx * np.cos(theta), nose[1] + (y2 - nose[1]) * np.sin(theta)],
+            axis=1,
+        )
+
+    def to_points(points):
+        return [(int(round(x)), int(round(y))) for x, y in points]
+
+    return {
+        "left_eye": to_points([left_eye]),
+        "right_eye": to_points([right_eye]),
+        "nose_tip": to_points([nose]),
+        "top_lip": to_points([mouth_left, mouth_right]),
+        "chin": to_points(chin),
+    }
+
+
+# ArcFace 정렬 크롭(112×112)의 기준 5점 위치 (insightface.utils.face_align.arcface_dst)
+ARCFACE_KPS = np.array(
+    [
+        [38.2946, 51.6963],
+        [73.5318, 51.5014],
+        [56.0252, 71.7366],
+        [41.5493, 92.3655],
+        [70.7299, 92.2041],
+    ],
+    dtype=np.float32,
+)
+
+
+# 정렬 크롭(BGR) 증강 → 원본을 제외한 변형 크롭들 (밝기/블러/회전/노이즈 + 가림)
+# 정렬 크롭은 눈·코·입 위치가 고정이라 검출 없이 가림 위치를 정할 수 있음
+# 가림 효과 크기는 원본 해상도 얼굴 기준이므로 크롭을 scale배 키워 그린 뒤 다시 줄임
+def augment_crop(crop: np.ndarray, scale: int = 2) -> list:
+    variants = augment_image(crop)[1:]
+
+    size = crop.shape[0]
+    big = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+    ratio = size / 112 * scale
+    face = Face(
+        bbox=np.array([12, 0, 100, 112], dtype=np.float32) * ratio,
+        kps=ARCFACE_KPS * ratio,
+    )
+    for occluded in occlusion_augment(big, face_landmarks(face)):
+        variants.append(
+            cv2.resize(occluded, (size, size), interpolation=cv2.INTER_AREA)
+        )
+    return variants
+
+
+# 증강 적용 함수 (landmarks: face_landmarks 결과)
+def occlusion_augment(
+    image: np.ndarray, landmarks=None, region_list=["mask", "sunglasses"]
+):
     augmented = []
-    landmark_list = face_recognition.face_landmarks(image)
-    if not landmark_list:
+    if not landmarks:
         return []
 
-    landmarks = landmark_list[0]  # 첫 번째 얼굴 기준
-
     for region in region_list:
         masked = apply_occlusion(image, landmarks, region)
         augmented.append(masked)
 
-    return augmented
\ No newline at end of file
+    return augmented
@@ -1,24 +1,150 @@
 import os
 import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from src.constants import FACE_DATA_DIR
+import numpy as np
+
+from src.services.user.gallery_store import GalleryStore
+from src.services.user.coreset import select_coreset
+from src.utils.vector_utils import EMBEDDING_DIM
+from src.constants import FACE_DATA_DIR, FACE_RAW_MAX_VECTORS, FACE_CORESET_SIZE
 
 # 얼굴 데이터 저장소
 face_db = {}
+# face_db 사용자 항목 교체용 잠금 (등록 요청과 백그라운드 클러스터링이 같은 사용자를 바꿀 때)
+face_db_lock = threading.Lock()
+
+# 얼굴 벡터 바이너리 저장소 (raw 벡터 mmap 파일 + 인덱스)
+gallery_store = GalleryStore(FACE_DATA_DIR)
 
-# 저장된 얼굴 벡터 파일 불러오기
+
+# 저장된 얼굴 벡터 불러오기 (저장소 인덱스 한 번 읽기 + 벡터 파일 mmap)
+# 저장소가 없으면 구버전 face_{id}.pkl 파일들을 병렬로 읽어 저장소로 옮김 (pkl 파일은 그대로 둠)
 def load_faces_from_files():
-    for file in os.listdir(FACE_DATA_DIR):
-        if file.startswith("face_") and file.endswith(".pkl"):
-            try:
-                user_id = int(file.split("_")[1].split(".")[0])
-                with open(os.path.join(FACE_DATA_DIR, file), "rb") as f:
-                    loaded_data = pickle.load(f)
-
-                    # 만약 loaded_data가 리스트이면, 새로운 구조로 변환
-                    if isinstance(loaded_data, list):
-                        loaded_data = {"raw": loaded_data}
-                    face_db[user_id] = loaded_data
-                print(f"✅ {user_id}번 사용자의 얼굴 데이터를 불러왔습니다.")
-            except Exception as e:
-                print(f"⚠️ {file} 로딩 실패: {e}")
+    start = time.perf_counter()
+    if not gallery_store.exists():
+        legacy_db = load_legacy_pickles()
+        if not legacy_db:
+            return
+        gallery_store.compact(legacy_db)
+        print(f"📦 구버전 얼굴 데이터 {len(legacy_db)}명을 갤러리 저장소로 옮겼습니다.")
+
+    loaded = gallery_store.load()
+    if gallery_store.needs_compaction():
+        gallery_store.compact()
+        loaded = gallery_store.load()
+
+    face_db.update(loaded)
+    elapsed = time.perf_counter() - start
+    print(f"✅ 얼굴 데이터를 불러왔습니다 ({elapsed:.3f}s): {gallery_store.stats()}")
+
+
+# 구버전 pkl 파일 하나 로드 (프로세스 풀 워커에서 실행, 결과는 ndarray로 변환해 전달)
+def _load_legacy_file(path: str):
+    user_id = int(os.path.basename(path).split("_")[1].split(".")[0])
+    with open(path, "rb") as f:
+        loaded_data = pickle.load(f)
+
+    # 만약 loaded_data가 리스트이면, 새로운 구조로 변환
+    if isinstance(loaded_data, list):
+        loaded_data = {"raw": loaded_data}
+
+    # 벡터 리스트는 하나의 배열로 묶어야 프로세스 간 전달이 빠름
+    user_data = {
+        "raw": np.asarray(loaded_data.get("raw", []), dtype=np.float32).reshape(
+            -1, EMBEDDING_DIM
+        )
+    }
+    clusters = loaded_data.get("clusters")
+    if clusters:
+        user_data["clusters"] = {
+            "centroids": np.asarray(clusters["centroids"], dtype=np.float32),
+            "labels": np.asarray(clusters["labels"], dtype=np.int32),
+        }
+    return user_id, user_data
+
+
+# 실패한 파일 하나 때문에 전체 로드가 중단되지 않도록 예외를 결과로 반환
+def _safe_load_legacy_file(path: str):
+    try:
+        return _load_legacy_file(path)
+    except Exception as e:
+        return None, str(e)
+
+
+# 구버전 사용자별 pkl 파일 → face_db 형식 (여러 프로세스에서 병렬 로드)
+def load_legacy_pickles(data_dir: str = FACE_DATA_DIR, workers: int = 0) -> dict:
+    paths = [
+        os.path.join(data_dir, file)
+        for file in os.listdir(data_dir)
+        if file.startswith("face_") and file.endswith(".pkl")
+    ]
+    if not paths:
+        return {}
+
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers == 1:
+        results = list(map(_safe_load_legacy_file, paths))
+    else:
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_safe_load_legacy_file, paths, chunksize=chunksize))
+
+    legacy_db = {}
+    for path, (user_id, data) in zip(paths, results):
+        if user_id is None:
+            print(f"⚠️ {os.path.basename(path)} 로딩 실패: {data}")
+        else:
+            legacy_db[user_id] = data
+
+    print(f"✅ 구버전 얼굴 데이터 {len(legacy_db)}/{len(paths)}명 로드")
+    return legacy_db
+
+
+# 사용자 raw 벡터 추가 (메모리의 face_db만 갱신, 디스크 기록은 save_user_vectors)
+def add_user_vectors(user_id: int, vectors) -> dict:
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+    with face_db_lock:
+        if user_id in face_db:
+            user_data = face_db[user_id]
+            user_data["raw"] = np.concatenate([user_data["raw"], vectors])
+        else:
+            face_db[user_id] = {"raw": vectors}
+        return face_db[user_id]
+
+
+# raw 벡터가 FACE_RAW_MAX_VECTORS를 넘으면 FACE_CORESET_SIZE개의 다양한 벡터(coreset)만 남김
+# 반환: {"before": 압축 전 개수, "after": 압축 후 개수} 또는 None (압축 안 함)
+def compact_user_vectors(
+    user_id: int,
+    max_vectors: int = FACE_RAW_MAX_VECTORS,
+    size: int = FACE_CORESET_SIZE,
+):
+    with face_db_lock:
+        user_data = face_db[user_id]
+        keep = select_coreset(user_data["raw"], max_vectors, size)
+        if keep is None:
+            return None
+
+        before = len(user_data["raw"])
+        user_data["raw"] = np.asarray(user_data["raw"])[keep]
+        # labels가 더 이상 raw와 맞지 않음 → 다시 클러스터링
+        user_data.pop("clusters", None)
+    return {"before": before, "after": len(keep)}
+
+
+# 추가한 벡터와 현재 클러스터 결과를 저장소에 기록 (벡터는 파일 끝에 이어 쓰기)
+# replace=True면 사용자 raw 전체를 새로 기록 (coreset 압축 후)
+def save_user_vectors(user_id: int, vectors, replace: bool = False):
+    user_data = face_db[user_id]
+    if replace:
+        gallery_store.replace_user(user_id, user_data["raw"], user_data.get("clusters"))
+    else:
+        gallery_store.append(user_id, vectors, user_data.get("clusters"))
+
+
+# 사용자 클러스터 결과만 저장소 인덱스에 기록 (백그라운드 클러스터링 후)
+def save_user_clusters(user_id: int):
+    gallery_store.update_clusters(user_id, face_db[user_id].get("clusters"))
@@ -0,0 +1,37 @@
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 축소 배율 → OpenCV 축소 디코딩 플래그 (JPEG은 DCT 단계에서 바로 축소되어 빠름)
+_REDUCED_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+# 업로드 바이트 → OpenCV(BGR) 이미지 (디코딩 실패 시 None)
+def decode_image(image_bytes: bytes) -> np.ndarray:
+    image_np = np.frombuffer(image_bytes, np.uint8)  # 바이트를 NumPy 배열로 변환
+    return cv2.imdecode(image_np, cv2.IMREAD_COLOR)  # OpenCV 형식으로 변환
+
+
+# 긴 변이 min_side 이상으로 남는 가장 큰 배율(1/2, 1/4, 1/8)로 축소 디코딩
+# JPEG이 아니거나 이미지가 작으면 원본 그대로 디코딩
+# 반환: (BGR 이미지, 축소 배율) — 원본 좌표 = 축소 이미지 좌표 × 배율
+def decode_image_reduced(image_bytes: bytes, min_side: int):
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as header:  # 헤더만 읽음
+            image_format, long_side = header.format, max(header.size)
+    except Exception:
+        image_format, long_side = None, 0
+
+    if image_format == "JPEG":
+        for factor, flag in _REDUCED_FLAGS.items():
+            if long_side // factor >= min_side:
+                image_np = np.frombuffer(image_bytes, np.uint8)
+                return cv2.imdecode(image_np, flag), factor
+
+    return decode_image(image_bytes), 1
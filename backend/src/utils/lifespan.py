@@ -1,8 +1,15 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from src.services.user.storage import load_faces_from_files
+from src.services.user.storage import face_db, load_faces_from_files
+from src.services.user.gallery import face_gallery
+from src.services.user.insightface_wrapper import face_engine
+from src.services.user.inference_pool import inference_pool
+from src.services.user.recluster import recluster_scheduler
+from src.services.user.register import augment_pool
+from src.constants import FACE_ENGINE_WARMUP
 
 
 # 서버 시작/종료 시 실행되는 함수
@@ -10,8 +17,27 @@ from src.services.user.storage import load_faces_from_files
 async def lifespan(app: FastAPI):
     # 서버 시작 시, 저장된 벡터 파일들을 불러옴
     load_faces_from_files()
+    # 출석체크용 갤러리 행렬 구성
+    face_gallery.rebuild(face_db)
+    # 종료 전에 끝나지 못한 백그라운드 클러스터링 다시 예약
+    requeued = recluster_scheduler.requeue_stale(face_db)
+    if requeued:
+        print(f"🔁 클러스터링이 필요한 사용자 {requeued}명을 다시 예약했습니다.")
+
+    # 얼굴 인식 모델 로드 + 워밍업
+    warmup_task = None
+    if FACE_ENGINE_WARMUP == "blocking":
+        await asyncio.to_thread(face_engine.warmup)
+    elif FACE_ENGINE_WARMUP == "background":
+        warmup_task = asyncio.create_task(asyncio.to_thread(face_engine.warmup))
     print("서버 시작 - 셀레니움은 요청 시 동적으로 실행됩니다.")
 
     yield
 
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    inference_pool.shutdown()
+    augment_pool.shutdown()
+    # 예약된 클러스터링을 마저 처리하고 저장소에 기록
+    await asyncio.to_thread(recluster_scheduler.shutdown)
     print("서버 종료")
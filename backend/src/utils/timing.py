@@ -0,0 +1,40 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+# 단계별 누적 실행 시간 기록 (여러 요청/스레드에서 공유)
+class StageTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, list] = {}  # stage -> [횟수, 누적 초]
+
+    def add(self, stage: str, seconds: float, count: int = 1):
+        with self._lock:
+            stat = self._stats.setdefault(stage, [0, 0.0])
+            stat[0] += count
+            stat[1] += seconds
+
+    @contextmanager
+    def measure(self, stage: str, count: int = 1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, count)
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                stage: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 2),
+                    "avg_ms": round(total * 1000 / count, 3) if count else 0.0,
+                }
+                for stage, (count, total) in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,11 @@
+import numpy as np
+
+EMBEDDING_DIM = 512  # InsightFace(buffalo_l) 임베딩 차원
+
+
+# 벡터들을 float32 행렬로 바꾸고 행 단위 L2 정규화
+def normalize_rows(vectors) -> np.ndarray:
+    X = np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # 0 벡터 나눗셈 방지
+    return X / norms
@@ -0,0 +1,106 @@
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.constants import (
+    VIDEO_SAMPLE_FPS,
+    VIDEO_MAX_FRAMES,
+    VIDEO_SEEK_MIN_STEP,
+    VIDEO_TEMP_DIR,
+)
+
+
+# 업로드 영상 바이트 → VideoCapture
+# OpenCV 4.10+는 메모리 스트림에서 바로 디코딩, 그 외에는 메모리 파일시스템(/dev/shm) 임시 파일 사용
+@contextmanager
+def open_video(video_bytes: bytes):
+    cap, temp_path = None, None
+    try:
+        stream = io.BufferedReader(io.BytesIO(video_bytes))
+        cap = cv2.VideoCapture(stream, cv2.CAP_FFMPEG, [])
+    except (TypeError, cv2.error):
+        cap = None
+
+    if cap is None or not cap.isOpened():
+        temp_dir = VIDEO_TEMP_DIR if os.path.isdir(VIDEO_TEMP_DIR) else None
+        fd, temp_path = tempfile.mkstemp(suffix=".mp4", dir=temp_dir)
+        with os.fdopen(fd, "wb") as f:
+            f.write(video_bytes)
+        cap = cv2.VideoCapture(temp_path)
+
+    try:
+        yield cap
+    finally:
+        cap.release()
+        if temp_path:
+            os.remove(temp_path)
+
+
+# 순차 디코딩: 샘플 사이 프레임은 grab만 하고 (BGR 변환·복사 없음) 샘플 프레임만 retrieve
+# FFmpeg 백엔드의 grab()도 프레임 디코딩은 함 (P/B 프레임은 앞 프레임이 있어야 복원 가능)
+# → 아끼는 것은 색 변환·복사뿐, 건너뛰는 프레임을 디코딩하지 않으려면 _seek_frames
+# step이 있으면 프레임 번호 기준, 없으면 타임스탬프 기준 (가변 프레임레이트 영상도 일정 간격)
+def _grab_frames(cap, step: Optional[int], period_ms: float):
+    index = -1
+    next_ms = 0.0
+    while cap.grab():
+        index += 1
+        if step:
+            take = index % step == 0
+        else:
+            pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            take = pos_ms >= next_ms
+            if take:
+                next_ms = max(next_ms + period_ms, pos_ms)
+        if not take:
+            continue
+
+        success, frame = cap.retrieve()
+        if success:
+            yield index, frame
+
+
+# 탐색 디코딩: 샘플 간격이 키프레임 간격보다 넓을 때 건너뛸 프레임을 디코딩하지 않음
+# (seek은 앞 키프레임부터 다시 디코딩하므로 간격이 좁으면 오히려 느림)
+def _seek_frames(cap, step: int, total: int):
+    for index in range(0, total, step):
+        if index:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        success, frame = cap.read()
+        if not success:
+            break
+        yield index, frame
+
+
+# 영상에서 샘플링한 프레임을 하나씩 생성 → (프레임 번호, BGR 프레임)
+# - sample_fps: 초당 추출 프레임 수 (interval을 주면 interval 프레임마다 하나)
+# - max_frames: 최대 추출 프레임 수 (0이면 제한 없음)
+# 프레임을 리스트에 모으지 않으므로 긴 영상도 메모리 사용량이 일정함
+def iter_video_frames(
+    video_bytes: bytes,
+    sample_fps: float = VIDEO_SAMPLE_FPS,
+    interval: Optional[int] = None,
+    max_frames: int = VIDEO_MAX_FRAMES,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    if not interval and sample_fps <= 0:
+        interval = 1
+
+    with open_video(video_bytes) as cap:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = interval or max(1, round(fps / sample_fps))
+
+        if step >= VIDEO_SEEK_MIN_STEP and total > 0:
+            frames = _seek_frames(cap, step, total)
+        else:
+            frames = _grab_frames(cap, interval, 1000.0 / (sample_fps or fps))
+
+        for n, item in enumerate(frames):
+            if max_frames and n >= max_frames:
+                break
+            yield item
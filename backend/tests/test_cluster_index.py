@@ -0,0 +1,45 @@
+import numpy as np
+
+from src.services.user.cluster_index import build_cluster_index, extend_cluster_index
+from src.services.user.clustering import update_user_clusters
+
+
+# 새 행만 끼워 넣은 결과 = 전체 labels로 다시 만든 결과
+def test_extend_matches_full_build():
+    rng = np.random.default_rng(0)
+    raw = rng.standard_normal((50, 512)).astype(np.float32)
+    labels = rng.integers(0, 4, 50).astype(np.int32)
+    labels[:4] = np.arange(4)
+
+    members, offsets, order = build_cluster_index(raw[:30], labels[:30], 4)
+    clusters = {"members": members, "offsets": offsets, "order": order}
+    extended = extend_cluster_index(clusters, raw, labels[30:])
+
+    for got, expected in zip(extended, build_cluster_index(raw, labels, 4)):
+        np.testing.assert_allclose(got, expected, rtol=1e-6)
+
+    # 저장소에서 읽은 클러스터처럼 members 없이 order/offsets만 있어도 동작
+    del clusters["members"]
+    np.testing.assert_array_equal(
+        extend_cluster_index(clusters, raw, labels[30:])[2], extended[2]
+    )
+
+
+def test_incremental_update_keeps_index_consistent():
+    rng = np.random.default_rng(1)
+    face_db = {1: {"raw": rng.standard_normal((40, 512)).astype(np.float32)}}
+    update_user_clusters(face_db, 1, n_clusters=3)
+
+    # 기존 분포와 같은 벡터를 조금 추가 → 증분 갱신
+    face_db[1]["raw"] = np.concatenate(
+        [face_db[1]["raw"], face_db[1]["raw"][:5] * 1.01]
+    )
+    message = update_user_clusters(face_db, 1, n_clusters=3)
+    assert "증분 갱신" in message
+
+    clusters = face_db[1]["clusters"]
+    expected = build_cluster_index(face_db[1]["raw"], clusters["labels"], 3)
+    for got, want in zip(
+        (clusters["members"], clusters["offsets"], clusters["order"]), expected
+    ):
+        np.testing.assert_allclose(got, want, rtol=1e-6)
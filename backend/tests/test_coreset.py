@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.services.user.coreset import farthest_point_coreset, select_coreset
+
+
+# 같은 벡터가 반복되는 정지 화면 영상: 중복 없이 서로 다른 벡터만 고르고 멈춤
+def test_coreset_has_no_duplicates_for_repeated_vectors():
+    rng = np.random.default_rng(0)
+    vectors = np.repeat(rng.standard_normal((5, 512)), 60, axis=0)
+
+    keep = farthest_point_coreset(vectors, 200)
+    assert len(keep) == len(set(keep.tolist())) == 5
+    assert len({tuple(v) for v in vectors[keep]}) == 5
+
+
+def test_coreset_size_and_order():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((400, 512))
+
+    keep = select_coreset(vectors, max_vectors=300, size=200)
+    assert len(set(keep.tolist())) == 200
+    assert np.all(np.diff(keep) > 0)
+    assert select_coreset(vectors[:300], max_vectors=300, size=200) is None
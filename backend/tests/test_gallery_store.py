@@ -0,0 +1,146 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.services.user.gallery_store import GalleryStore
+from src.services.user.storage import load_legacy_pickles
+from src.utils.vector_utils import EMBEDDING_DIM
+
+
+def _vectors(rng, n):
+    return rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+
+
+def _clusters(n, k=2):
+    labels = np.arange(n, dtype=np.int32) % k
+    centroids = np.eye(k, EMBEDDING_DIM, dtype=np.float32)
+    return {"centroids": centroids, "labels": labels}
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+# 추가 → 클러스터 갱신 → 새 인스턴스로 다시 읽기
+def test_append_update_clusters_reload(tmp_path, rng):
+    store = GalleryStore(str(tmp_path))
+    a1, a2, b = _vectors(rng, 3), _vectors(rng, 4), _vectors(rng, 5)
+    store.append(1, a1)
+    store.append(2, b, _clusters(5))
+    store.append(1, a2)
+    store.update_clusters(1, _clusters(7))
+    store.update_clusters(99, _clusters(1))  # 없는 사용자는 무시
+
+    loaded = GalleryStore(str(tmp_path)).load()
+    assert sorted(loaded) == [1, 2]
+    np.testing.assert_array_equal(loaded[1]["raw"], np.concatenate([a1, a2]))
+    np.testing.assert_array_equal(loaded[2]["raw"], b)
+    np.testing.assert_array_equal(
+        loaded[1]["clusters"]["labels"], _clusters(7)["labels"]
+    )
+    np.testing.assert_array_equal(
+        loaded[2]["clusters"]["centroids"], _clusters(5)["centroids"]
+    )
+
+    store.update_clusters(2, None)
+    assert "clusters" not in GalleryStore(str(tmp_path)).load()[2]
+
+
+# compaction: 사용자별 연속 구간으로 새 세대 파일 작성, 이전 파일 삭제, 내용은 그대로
+def test_compaction_round_trip(tmp_path, rng):
+    store = GalleryStore(str(tmp_path))
+    a = [_vectors(rng, 2) for _ in range(4)]
+    for part in a:
+        store.append(1, part)
+    store.replace_user(2, _vectors(rng, 3))
+    new_b = _vectors(rng, 2)
+    store.replace_user(2, new_b, _clusters(2))
+    assert store.needs_compaction()
+
+    old_path = store.vectors_path
+    store.compact()
+    assert not os.path.exists(old_path)
+    assert store.stats()["segments"] == 2
+    assert store.stats()["rows"] == 8 + 2
+    assert not store.needs_compaction()
+
+    loaded = GalleryStore(str(tmp_path)).load()
+    np.testing.assert_array_equal(loaded[1]["raw"], np.concatenate(a))
+    np.testing.assert_array_equal(loaded[2]["raw"], new_b)
+    np.testing.assert_array_equal(
+        loaded[2]["clusters"]["labels"], _clusters(2)["labels"]
+    )
+
+
+# 같은 저장소를 쓰는 두 인스턴스(워커 프로세스 대신): 쓰기 잠금 안에서 서로의 추가분을 반영
+def test_two_writers_share_index(tmp_path, rng):
+    first, second = GalleryStore(str(tmp_path)), GalleryStore(str(tmp_path))
+    a, b = _vectors(rng, 2), _vectors(rng, 3)
+    first.append(1, a)
+    second.append(2, b)
+    first.remove_user(1)
+
+    loaded = GalleryStore(str(tmp_path)).load()
+    assert sorted(loaded) == [2]
+    np.testing.assert_array_equal(loaded[2]["raw"], b)
+
+
+# 쓰다가 죽어 인덱스에 없는 벡터 파일 꼬리는 무시되고 다음 추가 때 잘려 나감
+def test_unindexed_tail_is_ignored(tmp_path, rng):
+    store = GalleryStore(str(tmp_path))
+    a = _vectors(rng, 2)
+    store.append(1, a)
+    with open(store.vectors_path, "ab") as f:
+        f.write(_vectors(rng, 1).tobytes())
+
+    np.testing.assert_array_equal(GalleryStore(str(tmp_path)).load()[1]["raw"], a)
+    b = _vectors(rng, 1)
+    store.append(1, b)
+    np.testing.assert_array_equal(
+        GalleryStore(str(tmp_path)).load()[1]["raw"], np.concatenate([a, b])
+    )
+
+
+# 증분 클러스터링 정보(order/offsets, fit_size/inertia)도 재시작 후 그대로 복원
+def test_cluster_index_and_refit_state_persist(tmp_path, rng):
+    clusters = _clusters(6, k=3)
+    clusters.update(fit_size=4, inertia=0.25)
+    store = GalleryStore(str(tmp_path))
+    store.append(1, _vectors(rng, 6), clusters)
+    store.append(2, _vectors(rng, 2), _clusters(2))
+
+    loaded = GalleryStore(str(tmp_path)).load()
+    first = loaded[1]["clusters"]
+    np.testing.assert_array_equal(first["order"], [0, 3, 1, 4, 2, 5])
+    np.testing.assert_array_equal(first["offsets"], [0, 2, 4, 6])
+    assert first["fit_size"] == 4 and first["inertia"] == 0.25
+    assert "fit_size" not in loaded[2]["clusters"]
+
+    store.compact()
+    assert GalleryStore(str(tmp_path)).load()[1]["clusters"]["fit_size"] == 4
+
+
+# 구버전 face_{id}.pkl (리스트 형식 / dict 형식) → 저장소로 옮긴 뒤 다시 읽기
+def test_legacy_pickle_migration(tmp_path, rng):
+    a, b = _vectors(rng, 3), _vectors(rng, 4)
+    with open(tmp_path / "face_1.pkl", "wb") as f:
+        pickle.dump(list(a), f)
+    with open(tmp_path / "face_2.pkl", "wb") as f:
+        pickle.dump({"raw": list(b), "clusters": _clusters(4)}, f)
+    with open(tmp_path / "face_3.pkl", "wb") as f:
+        f.write(b"broken")  # 실패한 파일은 건너뜀
+
+    legacy_db = load_legacy_pickles(str(tmp_path), workers=1)
+    assert sorted(legacy_db) == [1, 2]
+
+    GalleryStore(str(tmp_path)).compact(legacy_db)
+    loaded = GalleryStore(str(tmp_path)).load()
+    np.testing.assert_array_equal(loaded[1]["raw"], a)
+    np.testing.assert_array_equal(loaded[2]["raw"], b)
+    assert "clusters" not in loaded[1]
+    np.testing.assert_array_equal(
+        loaded[2]["clusters"]["labels"], _clusters(4)["labels"]
+    )